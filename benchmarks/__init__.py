@@ -0,0 +1 @@
+'''Benchmark suite for pfinance, run with python -m benchmarks'''
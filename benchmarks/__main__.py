@@ -0,0 +1,171 @@
+'''Runs the pfinance benchmarks and compares stored results, see python -m benchmarks --help'''
+import argparse
+import datetime
+import fnmatch
+import gc
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from benchmarks.cases import CASES, COVERED_MODULES
+
+SIZES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def uncovered_functions() -> list[str]:
+    '''
+    Returns the public functions and classes of the covered modules without a benchmark case.
+
+        Returns:
+            uncovered (list[str]): Qualified names missing from CASES
+    '''
+    covered = {name.split('[')[0] for name in CASES}
+    uncovered = []
+    for module in COVERED_MODULES:
+        prefix = module.__name__.split('.')[-1]
+        for name, member in vars(module).items():
+            public = not name.startswith('_') and getattr(member, '__module__', None) == module.__name__
+            if public and (inspect.isfunction(member) or inspect.isclass(member)) and f'{prefix}.{name}' not in covered:
+                uncovered.append(f'{prefix}.{name}')
+    return uncovered
+
+
+def measure(run, repeat: int) -> tuple[float, int]:
+    '''
+    Returns the fastest time of one call and the peak memory it allocates.
+
+        Parameters:
+            run (callable): Benchmarked call
+            repeat (int): Number of timing repetitions
+
+        Returns:
+            seconds (float): Fastest time of one call
+            peak_bytes (int): Peak memory traced by tracemalloc during one call
+    '''
+    timer = timeit.Timer(run)
+    number, elapsed = timer.autorange()
+    seconds = min([elapsed] + timer.repeat(repeat - 1, number)) / number
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak_bytes
+
+
+def run_benchmarks(names: list[str], sizes: list[int], repeat: int, time_budget: float) -> list[dict]:
+    '''
+    Returns the measurements of each benchmark at each size.
+    Larger sizes of a benchmark are skipped once one call takes longer than the time budget.
+
+        Parameters:
+            names (list[str]): Benchmarks to run
+            sizes (list[int]): Problem sizes, in increasing order
+            repeat (int): Number of timing repetitions
+            time_budget (float): Seconds per call after which larger sizes are skipped
+
+        Returns:
+            results (list[dict]): Benchmark name, size, seconds and peak_bytes of each measurement
+    '''
+    results = []
+    for name in names:
+        for size in sizes:
+            seconds, peak_bytes = measure(CASES[name](size), repeat)
+            results.append({'name': name, 'size': size, 'seconds': seconds, 'peak_bytes': peak_bytes})
+            print(f'{name:<60} {size:>10} {seconds:>12.3e} s {peak_bytes:>14,} B', flush=True)
+            if seconds > time_budget:
+                break
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    '''
+    Prints the time and memory ratios between two stored runs.
+
+        Parameters:
+            baseline (dict): Stored results of the reference commit
+            current (dict): Stored results of the commit under test
+            threshold (float): Time ratio above which a benchmark is reported as a regression
+
+        Returns:
+            regressed (bool): True if any benchmark is slower than the threshold
+    '''
+    reference = {(result['name'], result['size']): result for result in baseline['results']}
+    regressed = False
+    print(f"{'benchmark':<60} {'size':>10} {'time':>8} {'memory':>8}")
+    for result in current['results']:
+        base = reference.get((result['name'], result['size']))
+        if base is None:
+            continue
+        time_ratio = result['seconds'] / base['seconds']
+        memory_ratio = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else float('nan')
+        flag = ' REGRESSION' if time_ratio > threshold else ''
+        regressed = regressed or bool(flag)
+        print(f"{result['name']:<60} {result['size']:>10} {time_ratio:>8.2f} {memory_ratio:>8.2f}{flag}")
+    return regressed
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split(',')[0])
+    parser.add_argument('patterns', nargs='*', default=['*'], help='glob patterns of benchmarks to run, default all')
+    parser.add_argument('--max-size', type=int, default=SIZES[-1], help='largest problem size, default 10000000')
+    parser.add_argument('--repeat', type=int, default=3, help='timing repetitions, default 3')
+    parser.add_argument('--time-budget', type=float, default=1.0,
+                        help='seconds per call after which larger sizes are skipped, default 1')
+    parser.add_argument('--output', help='JSON file for the results, default .benchmarks/<commit>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='compare two stored runs and exit')
+    parser.add_argument('--threshold', type=float, default=1.2, help='time ratio reported as a regression, default 1.2')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as baseline, open(args.compare[1]) as current:
+            return int(compare(json.load(baseline), json.load(current), args.threshold))
+
+    uncovered = uncovered_functions()
+    if uncovered:
+        print('Public functions without a benchmark: ' + ', '.join(uncovered), file=sys.stderr)
+        return 1
+
+    names = sorted(name for name in CASES if any(fnmatch.fnmatchcase(name, pattern) for pattern in args.patterns))
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    sizes = [size for size in SIZES if size <= args.max_size]
+    commit = git_commit()
+    results = run_benchmarks(names, sizes, args.repeat, args.time_budget)
+
+    output = args.output or os.path.join('.benchmarks', f'{commit or "results"}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, file, indent=2)
+    print(f'Results written to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,433 @@
+'''Benchmark cases for the public pfinance functions'''
+import datetime
+import importlib
+import random
+import sys
+from collections import deque
+from functools import partial
+
+from pfinance import conversion, curves, depreciation, factors, general, securities, time_value
+
+# Each case maps a name to a setup function, which builds the inputs for a problem size and returns a callable timing
+# only the work under test. For functions of scalars the size is the number of rows evaluated, for functions of
+# sequences it is the length of the sequence, and for array functions returning matrices it is the number of cells.
+CASES = {}
+
+# Modules whose public functions and classes must all have a case
+COVERED_MODULES = (general, time_value, depreciation, securities, conversion)
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def uniform(low, high):
+    def column(size, seed=0):
+        rng = random.Random(seed)
+        return [rng.uniform(low, high) for _ in range(size)]
+    return column
+
+
+def integers(low, high):
+    def column(size, seed=0):
+        rng = random.Random(seed)
+        return [rng.randint(low, high) for _ in range(size)]
+    return column
+
+
+def constant(value):
+    return lambda size: [value] * size
+
+
+def rows(function, *columns):
+    # Returns a setup evaluating function once per row of the generated columns.
+    def setup(size):
+        data = [column(size) for column in columns]
+        return lambda: deque(map(function, *data), 0)
+    return setup
+
+
+def cash_flows(size):
+    return [-1000.0 * size] + uniform(50, 250)(size - 1) if size > 1 else [-1000.0]
+
+
+@case('pfinance.__init__')
+def cold_import(size):
+    # Repeats a cold import of the package with every pfinance module unloaded first, then restores the loaded
+    # modules so the other cases keep using the same module objects
+    def run():
+        loaded = {name: module for name, module in sys.modules.items() if name.split('.')[0] == 'pfinance'}
+        try:
+            for _ in range(size):
+                for name in [name for name in sys.modules if name.split('.')[0] == 'pfinance']:
+                    del sys.modules[name]
+                importlib.import_module('pfinance')
+        finally:
+            sys.modules.update(loaded)
+    return run
+
+
+# General
+CASES['general.simple_interest'] = rows(general.simple_interest, uniform(100, 1e6), uniform(0, 0.1), integers(1, 30))
+CASES['general.compound_interest'] = rows(
+    general.compound_interest, uniform(100, 1e6), uniform(0, 0.1), integers(1, 30), constant(12)
+)
+CASES['general.effective_interest'] = rows(general.effective_interest, uniform(0, 0.1), integers(1, 365))
+CASES['general.loan_payment'] = rows(
+    general.loan_payment, uniform(1e3, 1e6), uniform(0.01, 0.1), constant(12), integers(12, 360)
+)
+CASES['general.equivalent_interest_rate'] = rows(
+    general.equivalent_interest_rate, uniform(100, 200), uniform(200, 400), integers(1, 30)
+)
+CASES['general.number_periods_loan'] = rows(
+    general.number_periods_loan, uniform(1e3, 1e4), uniform(0.01, 0.05), uniform(600, 1000)
+)
+CASES['general.factorial'] = rows(general.factorial, integers(0, 1000))
+
+
+@case('general.loan_payment_schedule')
+def loan_payment_schedule(size):
+    return partial(general.loan_payment_schedule, 250000, 0.05, 12, size)
+
+
+@case('general.amortization_schedule')
+def amortization_schedule(size):
+    return lambda: deque(general.amortization_schedule(250000, 0.05, 12, size), 0)
+
+
+@case('general.sum_product')
+def sum_product(size):
+    return partial(general.sum_product, uniform(-1, 1)(size), uniform(-1, 1)(size, 1))
+
+
+@case('general.sum_squares')
+def sum_squares(size):
+    return partial(general.sum_squares, uniform(-1, 1)(size))
+
+
+@case('general.sum_diff_squares')
+def sum_diff_squares(size):
+    return partial(general.sum_diff_squares, uniform(-1, 1)(size), uniform(-1, 1)(size, 1))
+
+
+# Time Value
+CASES['time_value.future_value_series'] = rows(
+    time_value.future_value_series, uniform(10, 1000), uniform(0, 0.1), integers(1, 40), constant(12)
+)
+CASES['time_value.present_value'] = rows(time_value.present_value, uniform(10, 1000), uniform(0.01, 0.1), integers(1, 40))
+
+
+@case('time_value.discounted_cash_flow')
+def discounted_cash_flow(size):
+    return partial(time_value.discounted_cash_flow, uniform(-100, 100)(size), 0.05)
+
+
+def rate_grid_valuation(cache):
+    # Values 30 year monthly cash flow schedules at rates drawn from a grid of ten, with size counting cash flows
+    def setup(size):
+        schedules = [uniform(-100, 100)(360) for _ in range(8)]
+        rates = [0.02 + 0.0025 * step for step in integers(0, 9)(-(-size // 360))]
+        arguments = [(schedules[i % 8], rate) for i, rate in enumerate(rates)]
+        cached = factors.factor_cache() if cache else None
+        for schedule, rate in arguments:
+            time_value.discounted_cash_flow(schedule, rate, cached)  # The service runs with a warm cache
+        return lambda: deque((time_value.discounted_cash_flow(schedule, rate, cached) for schedule, rate in arguments), 0)
+    return setup
+
+
+CASES['time_value.discounted_cash_flow[rate grid]'] = rate_grid_valuation(cache=False)
+CASES['time_value.discounted_cash_flow[rate grid, cache]'] = rate_grid_valuation(cache=True)
+
+
+@case('time_value.modified_internal_rate_of_return')
+def modified_internal_rate_of_return(size):
+    return partial(time_value.modified_internal_rate_of_return, cash_flows(max(size, 2)), 0.05, 0.07)
+
+
+@case('time_value.future_value_schedule')
+def future_value_schedule(size):
+    return partial(time_value.future_value_schedule, 1000, uniform(0, 0.01)(size))
+
+
+@case('time_value.internal_rate_of_return')
+def internal_rate_of_return(size):
+    return partial(time_value.internal_rate_of_return, cash_flows(max(size, 2)))
+
+
+@case('time_value.xirr')
+def xirr(size):
+    start = datetime.date(2000, 1, 1)
+    dates = [start + datetime.timedelta(days=30 * i) for i in range(max(size, 2))]
+    return partial(time_value.xirr, cash_flows(max(size, 2)), dates)
+
+
+# Depreciation
+CASES['depreciation.straight_line_depreciation'] = rows(
+    depreciation.straight_line_depreciation, uniform(1e3, 1e5), uniform(0, 500), integers(1, 40)
+)
+CASES['depreciation.units_of_production_depreciation'] = rows(
+    depreciation.units_of_production_depreciation, uniform(1e3, 1e5), uniform(0, 500), integers(1000, 5000),
+    integers(1, 1000)
+)
+
+
+@case('depreciation.sum_of_years_depreciation')
+def sum_of_years_depreciation(size):
+    return partial(depreciation.sum_of_years_depreciation, 1e6, 1e3, size)
+
+
+@case('depreciation.double_declining_balance_depreciation')
+def double_declining_balance_depreciation(size):
+    return partial(depreciation.double_declining_balance_depreciation, 1e6, 1e3, size)
+
+
+@case('depreciation.declining_balance')
+def declining_balance(size):
+    return partial(depreciation.declining_balance, 1e6, 1e3, size, 6)
+
+
+@case('depreciation.iter_sum_of_years_depreciation')
+def iter_sum_of_years_depreciation(size):
+    return lambda: deque(depreciation.iter_sum_of_years_depreciation(1e6, 1e3, size), 0)
+
+
+@case('depreciation.iter_double_declining_balance_depreciation')
+def iter_double_declining_balance_depreciation(size):
+    return lambda: deque(depreciation.iter_double_declining_balance_depreciation(1e6, 1e3, size), 0)
+
+
+@case('depreciation.iter_declining_balance')
+def iter_declining_balance(size):
+    return lambda: deque(depreciation.iter_declining_balance(1e6, 1e3, size, 6), 0)
+
+
+@case('depreciation.stream_depreciation_schedules')
+def stream_depreciation_schedules(size):
+    # Assets with a 9 year life produce 10 rows each
+    assets = [(1e4 + i, 100, 9) for i in range(-(-size // 10))]
+    return partial(
+        depreciation.stream_depreciation_schedules, depreciation.iter_sum_of_years_depreciation, assets, lambda chunk: None
+    )
+
+
+# Securities
+CASES['securities.bond_coupon_rate'] = rows(securities.bond_coupon_rate, uniform(900, 1100), uniform(10, 60), constant(2))
+CASES['securities.norberts_gambit'] = rows(
+    securities.norberts_gambit, integers(1, 1000), uniform(10, 20), uniform(10, 20), uniform(1.2, 1.4)
+)
+CASES['securities.alpha'] = rows(securities.alpha, uniform(-0.1, 0.2), uniform(-0.1, 0.2))
+CASES['securities.expected_rate_of_return'] = rows(
+    securities.expected_rate_of_return, uniform(0, 0.05), uniform(0.5, 1.5), uniform(0.03, 0.08)
+)
+
+
+@case('securities.binomial_option_price')
+def binomial_option_price(size):
+    return partial(securities.binomial_option_price, 100, 105, 0.05, 0.2, 1, max(size, 1))
+
+
+@case('securities.binomial_option_price[american]')
+def binomial_option_price_american(size):
+    return partial(securities.binomial_option_price, 100, 105, 0.05, 0.2, 1, max(size, 1), False, True)
+
+
+def trades(size):
+    # Alternating buys and sells which never close a position
+    quantities = integers(1, 100)(size)
+    prices = uniform(10, 20)(size)
+    sides = ['buy' if i % 2 == 0 else 'sell' for i in range(size)]
+    return sides, [quantity * 2 if side == 'buy' else quantity for side, quantity in zip(sides, quantities)], prices
+
+
+@case('securities.adjusted_cost_base')
+def adjusted_cost_base(size):
+    sides, quantities, prices = trades(size)
+
+    def run():
+        acb = securities.adjusted_cost_base()
+        for side, quantity, price in zip(sides, quantities, prices):
+            if side == 'buy':
+                acb.buy(quantity, price, 5)
+            else:
+                acb.sell(quantity, price, 5)
+    return run
+
+
+@case('securities.acb_ledger')
+def acb_ledger(size):
+    sides, quantities, prices = trades(size)
+    security_ids = [i // 2 % 100 for i in range(size)]
+    return lambda: securities.acb_ledger().ingest(security_ids, sides, quantities, prices)
+
+
+@case('securities.acb_portfolio')
+def acb_portfolio(size):
+    sides, quantities, prices = trades(size)
+
+    def run():
+        portfolio = securities.acb_portfolio()
+        for i, (side, quantity, price) in enumerate(zip(sides, quantities, prices)):
+            if side == 'buy':
+                portfolio.buy(i // 2 % 10, i // 2 % 100, quantity, price)
+            else:
+                portfolio.sell(i // 2 % 10, i // 2 % 100, quantity, price)
+    return run
+
+
+# Conversion
+CASES['conversion.dollar_decimal'] = rows(conversion.dollar_decimal, uniform(90, 110), constant(32))
+CASES['conversion.dollar_fractional'] = rows(conversion.dollar_fractional, uniform(90, 110), constant(32))
+CASES['conversion.percent_to_basis'] = rows(conversion.percent_to_basis, uniform(0, 10))
+CASES['conversion.increase_to_basis'] = rows(conversion.increase_to_basis, uniform(90, 110), uniform(90, 110))
+CASES['conversion.basis_to_percent'] = rows(conversion.basis_to_percent, uniform(0, 1000))
+
+
+# Batch
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    from pfinance.batch import bonds as batch_bonds
+    from pfinance.batch import conversion as batch_conversion
+    from pfinance.batch import depreciation as batch_depreciation
+    from pfinance.batch import fixed_point as batch_fixed_point
+    from pfinance.batch import general as batch_general
+    from pfinance.batch import risk as batch_risk
+    from pfinance.batch import securities as batch_securities
+    from pfinance.batch import simulation as batch_simulation
+    from pfinance.batch import time_value as batch_time_value
+
+    def array(low, high, seed=0):
+        return lambda size: np.random.default_rng(seed).uniform(low, high, size)
+
+    def vectorized(function, *columns):
+        # Returns a setup calling function once on whole arrays of the generated columns.
+        def setup(size):
+            return partial(function, *(column(size) for column in columns))
+        return setup
+
+    CASES['batch.general.loan_payment'] = vectorized(
+        batch_general.loan_payment, array(1e3, 1e6), array(0, 0.1), lambda size: 12, lambda size: 360
+    )
+    CASES['batch.general.sum_product'] = vectorized(batch_general.sum_product, array(-1, 1), array(-1, 1, 1))
+    CASES['batch.general.sum_squares'] = vectorized(batch_general.sum_squares, array(-1, 1))
+    CASES['batch.general.sum_diff_squares'] = vectorized(batch_general.sum_diff_squares, array(-1, 1), array(-1, 1, 1))
+    CASES['batch.general.weighted_sum'] = vectorized(batch_general.weighted_sum, array(-1, 1), array(0, 1, 1))
+    CASES['batch.time_value.present_value'] = vectorized(
+        batch_time_value.present_value, array(10, 1000), array(0.01, 0.1), lambda size: 360
+    )
+    CASES['batch.time_value.discounted_cash_flow'] = vectorized(
+        batch_time_value.discounted_cash_flow, array(-100, 100), lambda size: 0.05
+    )
+    CASES['batch.securities.norberts_gambit'] = vectorized(
+        batch_securities.norberts_gambit, array(1, 1000), array(10, 20), array(10, 20, 1), array(1.2, 1.4)
+    )
+    CASES['batch.securities.break_even_rate'] = vectorized(
+        batch_securities.break_even_rate, array(1, 1000), array(10, 20), array(10, 20, 1), array(1, 10)
+    )
+    CASES['batch.securities.alpha'] = vectorized(batch_securities.alpha, array(-0.1, 0.2), array(-0.1, 0.2, 1))
+    CASES['batch.securities.expected_rate_of_return'] = vectorized(
+        batch_securities.expected_rate_of_return, array(0, 0.05), array(0.5, 1.5), array(0.03, 0.08)
+    )
+    CASES['batch.securities.rolling_beta'] = vectorized(
+        batch_securities.rolling_beta, array(-0.05, 0.05), array(-0.05, 0.05, 1), lambda size: 20
+    )
+    CASES['batch.securities.capm_analytics'] = vectorized(
+        batch_securities.capm_analytics, array(-0.05, 0.05), array(-0.05, 0.05, 1), lambda size: 0.0001, lambda size: 20
+    )
+    CASES['batch.securities.binomial_option_price'] = vectorized(
+        batch_securities.binomial_option_price, lambda size: 100, array(80, 120), lambda size: 0.05, lambda size: 0.2,
+        lambda size: 1, lambda size: 100
+    )
+
+    def schedule_size(size, periods):
+        # Number of rows of a schedule matrix with the given number of columns holding about size cells
+        return -(-size // periods)
+
+    @case('batch.general.loan_payment_schedule')
+    def batch_loan_payment_schedule(size):
+        loans = schedule_size(size, 12)
+        return partial(batch_general.loan_payment_schedule, array(1e3, 1e6)(loans), array(0, 0.1)(loans), 12, 12)
+
+    @case('batch.time_value.internal_rate_of_return')
+    def batch_internal_rate_of_return(size):
+        flows = np.random.default_rng(0).uniform(50, 250, (schedule_size(size, 10), 10))
+        flows[:, 0] = -1000
+        return partial(batch_time_value.internal_rate_of_return, flows)
+
+    @case('batch.time_value.xirr')
+    def batch_xirr(size):
+        flows = np.random.default_rng(0).uniform(50, 250, (schedule_size(size, 10), 10))
+        flows[:, 0] = -1000
+        return partial(batch_time_value.xirr, flows, np.arange(10) * 30)
+
+    for name in ('straight_line_depreciation', 'sum_of_years_depreciation', 'double_declining_balance_depreciation',
+                 'declining_balance'):
+        CASES['batch.depreciation.' + name] = (
+            lambda function: lambda size: partial(
+                function, array(1e4, 1e5)(schedule_size(size, 11)), array(0, 1e3)(schedule_size(size, 11)), 10
+            )
+        )(getattr(batch_depreciation, name))
+
+    @case('batch.simulation.simulate_future_value')
+    def batch_simulate_future_value(size):
+        model = batch_simulation.vasicek_model(0.003, 0.05, 0.004, 0.001)
+        return partial(batch_simulation.simulate_future_value, 1000, model, 12, schedule_size(size, 12), seed=0)
+
+    def bond_portfolio(size):
+        # Thirty year semi-annual bonds, with size counting cash flows
+        bonds = schedule_size(size, 60)
+        rng = np.random.default_rng(0)
+        return batch_bonds.bond_portfolio(100, rng.uniform(0, 0.08, bonds), 60, 2, rng.uniform(0, 1, bonds))
+
+    @case('batch.bonds.bond_portfolio.analytics')
+    def batch_bond_analytics(size):
+        return partial(bond_portfolio(size).analytics, 0.05)
+
+    @case('batch.bonds.bond_portfolio.yield_to_maturity')
+    def batch_bond_yield_to_maturity(size):
+        bonds = bond_portfolio(size)
+        return partial(bonds.yield_to_maturity, bonds.clean_price(0.05))
+
+    @case('batch.risk.key_rate_durations')
+    def batch_key_rate_durations(size):
+        # Ten years of monthly cash flows against ten key rates, with size counting cash flows
+        curve = curves.yield_curve([1, 2, 5, 10, 30], [0.02, 0.025, 0.03, 0.035, 0.04])
+        cash_flows = np.random.default_rng(0).uniform(0, 100, (schedule_size(size, 120), 120))
+        keys = [0.25, 0.5, 1, 2, 3, 4, 5, 6, 8, 10]
+        return partial(batch_risk.key_rate_durations, cash_flows, curve, keys, np.arange(1, 121) / 12)
+
+    @case('batch.fixed_point.loan_payment_schedule')
+    def batch_fixed_point_loan_payment_schedule(size):
+        loans = schedule_size(size, 360)
+        return partial(batch_fixed_point.loan_payment_schedule, array(1e3, 1e6)(loans), array(0, 0.1)(loans), 12, 360)
+
+    @case('batch.fixed_point.sum_of_years_depreciation')
+    def batch_fixed_point_sum_of_years_depreciation(size):
+        assets = schedule_size(size, 11)
+        return partial(batch_fixed_point.sum_of_years_depreciation, array(1e4, 1e5)(assets), array(0, 1e3)(assets), 10)
+
+    @case('batch.fixed_point.double_declining_balance_depreciation')
+    def batch_fixed_point_double_declining_balance_depreciation(size):
+        assets = schedule_size(size, 11)
+        return partial(
+            batch_fixed_point.double_declining_balance_depreciation, array(1e4, 1e5)(assets), array(0, 1e3)(assets), 10
+        )
+
+    CASES['batch.conversion.dollar_decimal'] = vectorized(batch_conversion.dollar_decimal, array(90, 110), lambda size: 32)
+    CASES['batch.conversion.dollar_fractional'] = vectorized(
+        batch_conversion.dollar_fractional, array(90, 110), lambda size: 32
+    )
+
+    @case('batch.conversion.parse_fractional_quotes')
+    def batch_parse_fractional_quotes(size):
+        # Newline separated quotes in 32nds, a third each whole, with a half tick and with eighths of a tick
+        rng = random.Random(0)
+        suffixes = ('', '+', '4')
+        text = '\n'.join(f'{rng.randint(90, 110)}-{rng.randint(0, 31):02d}{suffixes[i % 3]}' for i in range(size))
+        return partial(batch_conversion.parse_fractional_quotes, text.encode())
@@ -1,14 +1,23 @@
 import nox
 
+# Benchmarks are slow, so they only run when requested with nox -s benchmarks
+nox.options.sessions = ['lint', 'tests']
+
 
 @nox.session
 def lint(session):
-    targets = ['pfinance', 'tests', 'noxfile.py']
+    targets = ['pfinance', 'tests', 'benchmarks', 'noxfile.py']
     session.install('flake8')
     session.run('flake8', *targets)
 
 
 @nox.session
 def tests(session):
-    session.install('pytest')
+    session.install('pytest', 'numpy')
     session.run('pytest', '-v')
+
+
+@nox.session
+def benchmarks(session):
+    session.install('numpy')
+    session.run('python', '-m', 'benchmarks', *session.posargs)
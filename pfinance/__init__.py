@@ -1,7 +1,26 @@
-from importlib.metadata import version, PackageNotFoundError
+# Submodules and the package version are resolved on first access, so importing pfinance loads nothing else
+_SUBMODULES = frozenset({
+    'batch', 'combinatorics', 'conversion', 'curves', 'depreciation', 'factors', 'general', 'parallel', 'securities',
+    'time_value',
+})
 
-try:
-    __version__ = version('pfinance')
-except PackageNotFoundError:
-    # package is not installed
-    pass
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module(f'{__name__}.{name}')
+
+    if name == '__version__':
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            globals()['__version__'] = version('pfinance')
+            return globals()['__version__']
+        except PackageNotFoundError:
+            # package is not installed
+            pass
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES)
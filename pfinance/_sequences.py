@@ -0,0 +1,46 @@
+'''Conversion of array-like inputs into sequences of Python numbers'''
+from collections.abc import Sequence
+
+
+def as_sequence(values) -> Sequence:
+    '''
+    Returns values as an indexable sequence of Python numbers, without copying where possible.
+    Lists, tuples and ranges are returned unchanged. Buffer protocol objects (memoryview, array.array, NumPy arrays)
+    are wrapped in a flat memoryview in row-major order, copying only views that are not C-contiguous. Objects
+    exposing __array__ (e.g. Arrow arrays) are viewed through NumPy, arrays memoryview can not read are copied into a
+    list and any other iterable is copied into a tuple. Scalars, including 0-d arrays, raise TypeError.
+
+        Parameters:
+            values (Sequence[float]): List, tuple, array or buffer protocol object of values
+
+        Returns:
+            sequence (Sequence[float]): Indexable sequence over the same values
+    '''
+    if isinstance(values, (list, tuple, range)):
+        return values
+
+    try:
+        view = memoryview(values)
+    except (TypeError, ValueError):
+        # No buffer, or a format the buffer protocol can not describe such as NumPy datetime64
+        if hasattr(values, '__array__'):
+            import numpy
+            array = numpy.asarray(values)
+            if array.ndim == 0:
+                raise TypeError('values must be a sequence')
+            return array.ravel().tolist() if array is values else as_sequence(array)
+        return values if isinstance(values, Sequence) else tuple(values)
+    if view.ndim == 0:
+        raise TypeError('values must be a sequence')
+
+    try:
+        view[:1].tolist()
+    except NotImplementedError:
+        # memoryview can not read non-native formats such as big endian floats
+        return values.ravel().tolist() if hasattr(values, 'ravel') else tuple(values)
+
+    if view.ndim > 1:
+        # Flatten in row-major order, copying views that are not C-contiguous such as transposed arrays
+        source = view if view.c_contiguous else memoryview(view.tobytes())
+        view = source.cast('B').cast(view.format)
+    return view
@@ -0,0 +1,18 @@
+'''Array-based variants of pfinance functions, requires NumPy'''
+# NumPy is only imported when a submodule is first accessed
+_SUBMODULES = frozenset({
+    'bonds', 'conversion', 'curves', 'depreciation', 'fixed_point', 'general', 'risk', 'securities', 'simulation',
+    'time_value',
+})
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module(f'{__name__}.{name}')
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _SUBMODULES)
@@ -0,0 +1,49 @@
+'''Shared helpers for the array-based functions'''
+import numpy as np
+
+
+def broadcast_columns(*args) -> list[np.ndarray]:
+    # Broadcasts scalars and arrays against each other and flattens them into aligned float64 columns.
+    return [
+        column.ravel()
+        for column in np.broadcast_arrays(*(np.atleast_1d(np.asarray(arg, dtype=np.float64)) for arg in args))
+    ]
+
+
+def as_float_array(values) -> np.ndarray:
+    # Views NumPy arrays and buffer protocol objects (memoryview, array.array, Arrow buffers) of float64 without copying.
+    return np.asarray(values, dtype=np.float64)
+
+
+def compensated_sum(values: np.ndarray) -> np.ndarray:
+    # Sums along the last axis in a pairwise tree of error free additions, then adds back the summed rounding errors.
+    # The result is as accurate as a pairwise sum computed in twice the working precision.
+    error = np.zeros(values.shape[:-1])
+    while values.shape[-1] > 1:
+        if values.shape[-1] % 2:
+            values = np.concatenate([values, np.zeros(values.shape[:-1] + (1,))], axis=-1)
+        values, rounding = two_sum(values[..., 0::2], values[..., 1::2])
+        error += rounding.sum(axis=-1)
+    return values.sum(axis=-1) + error
+
+
+def two_sum(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Returns a + b and the exact rounding error of the addition (Knuth).
+    total = a + b
+    b_virtual = total - a
+    return total, (a - (total - b_virtual)) + (b - b_virtual)
+
+
+def split(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Splits a into high and low halves of 26 bits each (Dekker).
+    scaled = 134217729.0 * a
+    high = scaled - (scaled - a)
+    return high, a - high
+
+
+def two_product(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Returns a * b and the exact rounding error of the multiplication (Dekker).
+    product = a * b
+    a_high, a_low = split(a)
+    b_high, b_low = split(b)
+    return product, a_low * b_low - (((product - a_high * b_high) - a_low * b_high) - a_high * b_low)
@@ -0,0 +1,257 @@
+'''Array-based bond pricing and yield analytics'''
+import numpy as np
+
+
+class bond_portfolio:
+    '''
+    Represents a portfolio of fixed coupon bonds priced from yields to maturity.
+    The cash flow schedule of every bond is built once, as a matrix with one row per coupon period, and reused each
+    time the portfolio is repriced. Prices and their yield sensitivities are evaluated together in one Horner pass
+    over the schedule, without materializing a matrix of discount factors.
+
+    Methods:
+        accrued_interest(): Returns the interest accrued since the last coupon of each bond
+        dirty_price(yields): Returns the price of each bond including accrued interest
+        clean_price(yields): Returns the quoted price of each bond excluding accrued interest
+        macaulay_duration(yields): Returns the Macaulay duration of each bond in years
+        modified_duration(yields): Returns the modified duration of each bond in years
+        convexity(yields): Returns the convexity of each bond in years squared
+        analytics(yields): Returns all prices and sensitivities of each bond at once
+        yield_to_maturity(prices, dirty, guess, tolerance, max_iterations): Returns the yield of each bond at a price
+    '''
+    def __init__(
+        self,
+        face_value: np.ndarray,
+        coupon_rate: np.ndarray,
+        periods: np.ndarray,
+        frequency: int = 2,
+        accrued_fraction: np.ndarray = 0,
+    ):
+        '''
+        Constructs the necessary attributes for the bond portfolio object.
+        Inputs are broadcast against each other, so scalars and arrays may be mixed.
+
+        Parameters:
+            face_value (array_like): Par values of the bonds, repaid with the final coupon
+            coupon_rate (array_like): Annual coupon rates of the bonds
+            periods (array_like): Number of coupon payments remaining on each bond, must be greater than 0
+            frequency (int): Number of coupon payments per year, default 2
+            accrued_fraction (array_like): Fraction of the current coupon period elapsed since the last payment,
+                                           from 0 inclusive to 1 exclusive, default 0
+        '''
+        face_value, coupon_rate, periods, accrued_fraction = np.broadcast_arrays(
+            np.asarray(face_value, dtype=np.float64),
+            np.asarray(coupon_rate, dtype=np.float64),
+            np.asarray(periods, dtype=np.int64),
+            np.asarray(accrued_fraction, dtype=np.float64),
+        )
+        if np.any(periods < 1):
+            raise ValueError('every bond must have at least one remaining coupon period')
+        if np.any((accrued_fraction < 0) | (accrued_fraction >= 1)):
+            raise ValueError('accrued fraction must be at least 0 and less than 1')
+
+        self._shape = face_value.shape
+        self._frequency = frequency
+        self._accrued_fraction = accrued_fraction.ravel()
+        self._coupon = (face_value * coupon_rate / frequency).ravel()
+
+        # Periods first, so each step of the Horner pass reads one contiguous row
+        period = np.arange(1, periods.max(initial=1) + 1)[:, None]
+        periods = periods.ravel()
+        self._cash_flows = np.where(period <= periods, self._coupon, 0.0)
+        self._cash_flows += np.where(period == periods, face_value.ravel(), 0.0)
+
+    def __len__(self) -> int:
+        return self._coupon.size
+
+    def _moments(self, yields: np.ndarray, rows: np.ndarray = None, order: int = 2) -> tuple:
+        # Returns the dirty price of each bond with the sums of t * PV and t * (t + 1) * PV over its cash flows,
+        # where t is the time of a cash flow in periods, along with 1 + the periodic yield.
+        growth = 1 + yields / self._frequency
+        discount = 1 / growth
+        accrued = self._accrued_fraction if rows is None else self._accrued_fraction[rows]
+        present, first, second = np.zeros_like(discount), np.zeros_like(discount), np.zeros_like(discount)
+
+        # After processing period k, present holds sum(cf_j * x^(j - k + 1)) over j >= k, first and second accumulate
+        # it again so that at k = 1 they hold x * sum(j * cf_j * x^j) and x^2 * sum(j * (j + 1) / 2 * cf_j * x^j)
+        for cash_flow in self._cash_flows[::-1]:
+            present += cash_flow if rows is None else cash_flow[rows]
+            present *= discount
+            if order > 0:
+                first += present
+                first *= discount
+            if order > 1:
+                second += first
+                second *= discount
+
+        shift = growth ** accrued
+        weighted = (first * growth - accrued * present) * shift
+        curvature = (2 * second * growth ** 2 - 2 * accrued * first * growth + (accrued ** 2 - accrued) * present) * shift
+        return present * shift, weighted, curvature, growth
+
+    def _broadcast(self, values: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(np.asarray(values, dtype=np.float64), self._shape).ravel()
+
+    def accrued_interest(self) -> np.ndarray:
+        '''
+        Returns the interest accrued since the last coupon payment of each bond.
+
+        Returns:
+            accrued_interest (np.ndarray): Accrued interest of each bond
+        '''
+        return (self._coupon * self._accrued_fraction).reshape(self._shape)
+
+    def dirty_price(self, yields: np.ndarray) -> np.ndarray:
+        '''
+        Returns the price of each bond including accrued interest.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            dirty_price (np.ndarray): Present value of the remaining cash flows of each bond
+        '''
+        return self._moments(self._broadcast(yields), order=0)[0].reshape(self._shape)
+
+    def clean_price(self, yields: np.ndarray) -> np.ndarray:
+        '''
+        Returns the quoted price of each bond excluding accrued interest.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            clean_price (np.ndarray): Dirty price less accrued interest of each bond
+        '''
+        return self.dirty_price(yields) - self.accrued_interest()
+
+    def macaulay_duration(self, yields: np.ndarray) -> np.ndarray:
+        '''
+        Returns the Macaulay duration of each bond.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            macaulay_duration (np.ndarray): Present value weighted mean time to the cash flows in years
+        '''
+        return self.analytics(yields)['macaulay_duration']
+
+    def modified_duration(self, yields: np.ndarray) -> np.ndarray:
+        '''
+        Returns the modified duration of each bond.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            modified_duration (np.ndarray): Relative decrease in dirty price per unit increase in yield
+        '''
+        return self.analytics(yields)['modified_duration']
+
+    def convexity(self, yields: np.ndarray) -> np.ndarray:
+        '''
+        Returns the convexity of each bond.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            convexity (np.ndarray): Second derivative of the dirty price with respect to yield relative to the price
+        '''
+        return self.analytics(yields)['convexity']
+
+    def analytics(self, yields: np.ndarray) -> dict[str, np.ndarray]:
+        '''
+        Returns the prices and yield sensitivities of each bond from a single pass over the cash flow schedules.
+
+        Parameters:
+            yields (array_like): Annual yields to maturity, compounded at the coupon frequency
+
+        Returns:
+            bond_analytics (dict):
+                dirty_price (np.ndarray): Price of each bond including accrued interest
+                clean_price (np.ndarray): Price of each bond excluding accrued interest
+                accrued_interest (np.ndarray): Interest accrued since the last coupon of each bond
+                macaulay_duration (np.ndarray): Macaulay duration of each bond in years
+                modified_duration (np.ndarray): Modified duration of each bond in years
+                convexity (np.ndarray): Convexity of each bond in years squared
+        '''
+        dirty, weighted, curvature, growth = self._moments(self._broadcast(yields))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            macaulay = weighted / dirty / self._frequency
+            convexity = curvature / dirty / (growth * self._frequency) ** 2
+
+        accrued = self.accrued_interest()
+        return {
+            'dirty_price': dirty.reshape(self._shape),
+            'clean_price': dirty.reshape(self._shape) - accrued,
+            'accrued_interest': accrued,
+            'macaulay_duration': macaulay.reshape(self._shape),
+            'modified_duration': (macaulay / growth).reshape(self._shape),
+            'convexity': convexity.reshape(self._shape),
+        }
+
+    def yield_to_maturity(
+        self,
+        prices: np.ndarray,
+        dirty: bool = False,
+        guess: float = 0.05,
+        tolerance: float = 1e-10,
+        max_iterations: int = 50,
+    ) -> dict[str, np.ndarray]:
+        '''
+        Returns the yields to maturity of the bonds at the given prices, solved simultaneously.
+        Each bond is solved with Newton's method on the log of its price as a function of the log of one plus the
+        periodic yield, whose derivative is the Macaulay duration. The log price is convex and decreasing in this
+        variable, so iterations can not overshoot below a yield of -100% and every bond with a positive price
+        converges. Only bonds that have not yet converged are repriced on each iteration.
+
+        Parameters:
+            prices (array_like): Prices of the bonds
+            dirty (bool): Prices include accrued interest, default False for clean prices
+            guess (float): Starting estimate of the yields, default 0.05
+            tolerance (float): Change in yield between iterations at which a solution is accepted, default 1e-10
+            max_iterations (int): Maximum number of iterations, default 50
+
+        Returns:
+            yield_to_maturity_result (dict):
+                rate (np.ndarray): Annual yield to maturity of each bond, NaN where the bond did not converge
+                converged (np.ndarray): Whether each bond converged
+                iterations (np.ndarray): Number of iterations taken by each bond
+        '''
+        target = self._broadcast(prices)
+        if not dirty:
+            target = target + self._coupon * self._accrued_fraction
+
+        n_bonds = target.size
+        rate = np.full(n_bonds, np.nan)
+        converged = np.zeros(n_bonds, dtype=bool)
+        iterations = np.zeros(n_bonds, dtype=np.int64)
+        rows = np.flatnonzero(target > 0)
+        current = np.full(rows.size, float(guess))
+        log_target = np.log(target[rows])
+
+        with np.errstate(all='ignore'):
+            for iteration in range(1, max_iterations + 1):
+                if rows.size == 0:
+                    break
+
+                price, weighted, _, _ = self._moments(current, None if rows.size == n_bonds else rows, order=1)
+                log_growth = np.log1p(current / self._frequency) + (np.log(price) - log_target) * price / weighted
+                step = self._frequency * np.expm1(log_growth)
+
+                done = np.abs(step - current) < tolerance
+                failed = ~np.isfinite(step)
+                rate[rows[done]] = step[done]
+                converged[rows[done]] = True
+                iterations[rows] = iteration
+
+                keep = ~(done | failed)
+                rows, current, log_target = rows[keep], step[keep], log_target[keep]
+
+        return {
+            'rate': rate.reshape(self._shape),
+            'converged': converged.reshape(self._shape),
+            'iterations': iterations.reshape(self._shape),
+        }
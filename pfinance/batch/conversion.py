@@ -0,0 +1,162 @@
+'''Array-based unit and notation conversion functions'''
+import os
+
+import numpy as np
+
+# Powers of ten used to count the decimal digits of integer fraction denominators without converting them to strings
+_POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+_SEPARATORS = np.zeros(256, dtype=bool)
+_SEPARATORS[list(b' \t\r\n,;')] = True
+_VALID = _SEPARATORS.copy()
+_VALID[list(b'0123456789-+')] = True
+
+# Longest whole price parsed exactly into a float
+_MAX_WHOLE_DIGITS = 15
+
+
+def dollar_decimal(fractional_dollar: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    '''
+    Converts fractional dollars into decimal dollars.
+    For example, a value of 1.3 with fraction 4 represents 1 + 3/4 = 1.75. The scaling of each fraction is computed
+    once for the whole array, so a scalar fraction costs a single multiplication per value.
+
+        Parameters:
+            fractional_dollar (array_like): Numbers expressed as an integer portion and a fractional portion,
+                                            separated by a decimal
+            fraction (array_like): The denominators of the fractional portions, must be positive integers
+
+        Returns:
+            decimal_dollar (np.ndarray): The dollar decimal representations of the fractional dollars
+    '''
+    fractional_dollar = np.asarray(fractional_dollar, dtype=np.float64)
+    integer_part = np.trunc(fractional_dollar)
+    return integer_part + (fractional_dollar - integer_part) * _fraction_scale(fraction)
+
+
+def dollar_fractional(decimal_dollar: np.ndarray, fraction: np.ndarray) -> np.ndarray:
+    '''
+    Converts decimal dollars into fractional dollars.
+    For example, a value of 1.125 with fraction 16 repesents 1 + 12.5/100 = 1 + 2/16 = 1.02.
+
+        Parameters:
+            decimal_dollar (array_like): The decimal representations of the numbers
+            fraction (array_like): The denominators of the fractional portions, must be positive integers
+
+        Returns:
+            fractional_dollar (np.ndarray): The dollar fractional representations of the decimal dollars
+    '''
+    decimal_dollar = np.asarray(decimal_dollar, dtype=np.float64)
+    integer_part = np.trunc(decimal_dollar)
+    return integer_part + (decimal_dollar - integer_part) / _fraction_scale(fraction)
+
+
+def parse_fractional_quotes(source, fraction: int = 32, chunk_size: int = 1 << 20) -> np.ndarray:
+    '''
+    Returns the decimal prices of fractional price quotes, such as Treasury quotes in 32nds.
+    A quote is a whole price, a dash and a fixed width count of ticks below the fraction, e.g. '99-16' for 99 16/32.
+    A trailing '+' adds half a tick and a trailing digit from 0 to 7 adds that many eighths of a tick, so '99-16+' and
+    '99-164' are both 99 16.5/32. Whole prices have 1 to 15 digits. Quotes are separated by whitespace, commas or
+    semicolons. The text is parsed in chunks as arrays of bytes, so no Python object is created per quote.
+
+        Parameters:
+            source (bytes, file or path): Buffer of quote text, binary or text file object or path of a file of quotes
+            fraction (int): Number of ticks per unit of price, e.g. 32 or 64, default 32
+            chunk_size (int): Number of bytes read from a file at once, default 1048576
+
+        Returns:
+            prices (np.ndarray): Decimal price of each quote, in order
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return parse_fractional_quotes(file, fraction, chunk_size)
+
+    width = len(str(fraction - 1))
+    if not hasattr(source, 'read'):
+        return _parse_quotes(np.frombuffer(source, dtype=np.uint8), fraction, width)
+
+    prices, pending, offset = [], [], 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            # Text files are read one byte per character, so offsets in errors still count characters
+            chunk = chunk.encode('latin-1', errors='replace')
+
+        # Parse up to the last separator and carry the partial quote after it into the next chunk. Chunks without a
+        # separator are held until one ends their quote, so they are joined once instead of copied per chunk.
+        separators = np.flatnonzero(_SEPARATORS[np.frombuffer(chunk, dtype=np.uint8)])
+        if separators.size == 0:
+            pending.append(chunk)
+            continue
+
+        end = separators[-1] + 1
+        data = np.frombuffer(b''.join(pending) + chunk[:end], dtype=np.uint8)
+        prices.append(_parse_quotes(data, fraction, width, offset))
+        pending, offset = [chunk[end:]], offset + data.size
+
+    prices.append(_parse_quotes(np.frombuffer(b''.join(pending), dtype=np.uint8), fraction, width, offset))
+    return np.concatenate(prices)
+
+
+def _fraction_scale(fraction: np.ndarray) -> np.ndarray:
+    # Returns 10 ** digits / fraction, where digits is the number of decimal digits of each fraction.
+    fraction = np.asarray(fraction, dtype=np.int64)
+    digits = np.searchsorted(_POWERS_OF_TEN, fraction, side='right') + 1
+    return 10.0 ** digits / fraction
+
+
+def _parse_quotes(data: np.ndarray, fraction: int, width: int, offset: int = 0) -> np.ndarray:
+    # Parses a byte array holding whole quotes into their decimal prices, where offset is the position of the array
+    # in the stream. Only the quote boundaries and dashes are located by scanning every byte, the digits are then
+    # gathered by their offset from each quote's dash.
+    valid = _VALID[data]
+    if not valid.all():
+        position = int(np.argmin(valid))
+        raise ValueError(f'invalid character {chr(data[position])!r} in quote at byte {offset + position}')
+
+    edges = np.diff(np.concatenate(([1], _SEPARATORS[data], [1])).astype(np.int8))
+    starts, ends = np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+
+    # Quotes without a dash are whole prices, which behave as if the dash followed their last digit
+    dashes = np.flatnonzero(data == ord('-'))
+    owner = np.searchsorted(starts, dashes, side='right') - 1
+    if np.bincount(owner, minlength=starts.size).max(initial=0) > 1:
+        raise ValueError('quotes must contain at most one dash')
+    dash = ends.copy()
+    dash[owner] = dashes
+
+    def digits_at(distance, valid):
+        characters = data[np.where(valid, dash + distance, 0)].astype(np.int64)
+        if np.any(valid & ((characters < ord('0')) | (characters > ord('9')))):
+            raise ValueError('quotes must be a whole price, a dash and a fixed width count of ticks')
+        return np.where(valid, characters - ord('0'), 0)
+
+    whole_length = dash - starts
+    if np.any((whole_length == 0) | (whole_length > _MAX_WHOLE_DIGITS)):
+        raise ValueError(f'quotes must have a whole price of 1 to {_MAX_WHOLE_DIGITS} digits before the dash')
+    whole = np.zeros(starts.size)
+    for digit in range(1, int(whole_length.max(initial=0)) + 1):
+        whole += digits_at(-digit, digit <= whole_length) * 10.0 ** (digit - 1)
+
+    tick_length = ends - dash - 1
+    if np.any(tick_length > width + 1) or np.any((tick_length >= 0) & (tick_length < width)):
+        raise ValueError(f'quotes must have {width} tick digits after the dash')
+    ticks = np.zeros(starts.size)
+    for digit in range(1, width + 1):
+        ticks += digits_at(digit, tick_length >= width) * 10.0 ** (width - digit)
+    if np.any(ticks >= fraction):
+        raise ValueError(f'quotes must have fewer than {fraction} ticks')
+
+    # A trailing '+' is half a tick and a trailing digit counts eighths of a tick
+    extra = tick_length == width + 1
+    half = extra & (data[np.where(extra, dash + width + 1, 0)] == ord('+'))
+    if np.count_nonzero(data == ord('+')) != np.count_nonzero(half):
+        raise ValueError("'+' may only follow the tick digits of a quote")
+    eighths = digits_at(width + 1, extra & ~half)
+    if np.any(eighths > 7):
+        raise ValueError('a trailing tick digit counts eighths of a tick, so must be 0 to 7')
+    ticks += np.where(half, 0.5, eighths / 8)
+
+    return whole + ticks / fraction
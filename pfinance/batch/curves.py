@@ -0,0 +1,74 @@
+'''Array-based term structure of interest rates functions'''
+import weakref
+
+import numpy as np
+
+from pfinance.curves import yield_curve
+
+# Curves are immutable, so the arrays of their points are built once per curve and released with it
+_CURVE_ARRAYS = weakref.WeakKeyDictionary()
+
+
+def discount_factors(curve: yield_curve, times: np.ndarray) -> np.ndarray:
+    '''
+    Returns the interpolated discount factors of a yield curve at an array of times.
+    Tenor intervals are located for all times at once with a vectorized binary search.
+
+        Parameters:
+            curve (yield_curve): The yield curve to evaluate
+            times (array_like): Times in periods, e.g. years
+
+        Returns:
+            discount_factors (np.ndarray): Present value of one unit of currency received at each time
+    '''
+    times = np.asarray(times, dtype=np.float64)
+    tenors, zero_rates, log_discount, curvature = curve_arrays(curve)
+
+    i = np.searchsorted(tenors, times, side='right')
+    inside = (i > 0) & (i < tenors.size)
+    lower = np.clip(i - 1, 0, tenors.size - 1)
+    upper = np.clip(i, 0, tenors.size - 1)
+    span = np.where(inside, tenors[upper] - tenors[lower], 1.0)
+    weight = np.where(inside, (times - tenors[lower]) / span, 0.0)
+
+    with np.errstate(over='ignore'):
+        if curve.interpolation == 'log_linear':
+            interpolated = np.exp(log_discount[lower] + weight * (log_discount[upper] - log_discount[lower]))
+        else:
+            rate = zero_rates[lower] + weight * (zero_rates[upper] - zero_rates[lower])
+            if curve.interpolation == 'cubic':
+                a, b = 1 - weight, weight
+                rate += ((a ** 3 - a) * curvature[lower] + (b ** 3 - b) * curvature[upper]) * span ** 2 / 6
+            interpolated = (1 + rate) ** -times
+
+        # Zero rates are held flat beyond the first and last tenors
+        flat_rate = np.where(i == 0, zero_rates[0], zero_rates[-1])
+        factors = np.where(inside, interpolated, (1 + flat_rate) ** -times)
+
+    return np.where(times <= 0, 1.0, factors)
+
+
+def curve_arrays(curve: yield_curve) -> tuple:
+    '''
+    Returns the points of a yield curve as read-only arrays, cached for the lifetime of the curve.
+
+        Parameters:
+            curve (yield_curve): The yield curve
+
+        Returns:
+            tenors (np.ndarray): Times of the curve points in periods
+            zero_rates (np.ndarray): Zero rate per period at each tenor
+            log_discount_factors (np.ndarray): Natural logarithm of the discount factor at each tenor
+            curvature (np.ndarray): Cubic spline second derivatives at each tenor, None unless the curve is cubic
+    '''
+    arrays = _CURVE_ARRAYS.get(curve)
+    if arrays is None:
+        arrays = tuple(
+            None if points is None else np.array(points, dtype=np.float64)
+            for points in (curve.tenors, curve.zero_rates, curve.log_discount_factors, curve.curvature)
+        )
+        for array in arrays:
+            if array is not None:
+                array.flags.writeable = False
+        _CURVE_ARRAYS[curve] = arrays
+    return arrays
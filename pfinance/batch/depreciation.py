@@ -0,0 +1,160 @@
+'''Array-based depreciation of assets functions'''
+import numpy as np
+
+from pfinance.batch._utils import broadcast_columns
+
+
+def straight_line_depreciation(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+) -> np.ndarray:
+    '''
+    Calculates the constant periodic depreciation of many assets.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets in periods, must be greater than 0
+
+        Returns:
+            periodic_depreciation (np.ndarray): The periodic decrease in value of the assets
+    '''
+    return (np.asarray(purchase_price, dtype=np.float64) - salvage_value) / useful_life
+
+
+def sum_of_years_depreciation(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+) -> dict[str, np.ndarray]:
+    '''
+    Calculates the depreciation of many assets using sum of years depreciation.
+    Results are 2-D arrays of shape (assets, periods + 1), where assets with shorter lives hold their final value and
+    zero depreciation after their last period.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets, must be greater than 0
+
+        Returns:
+            sum_of_years_result (dict):
+                asset_value (np.ndarray): Value of the asset at the beginning of the period
+                periodic_depreciation (np.ndarray): Depreciation of the asset at the end of the period
+    '''
+    purchase_price, salvage_value, useful_life = broadcast_columns(purchase_price, salvage_value, useful_life)
+    total_years = useful_life * (useful_life + 1) / 2
+    period = np.arange(int(useful_life.max(initial=0)) + 1)
+    remaining_life = useful_life[:, None] - period + 1
+
+    periodic_depreciation = np.where(
+        (period > 0) & (remaining_life > 0),
+        ((purchase_price - salvage_value) / total_years)[:, None] * remaining_life,
+        0.0,
+    )
+
+    return {
+        'asset_value': purchase_price[:, None] - np.cumsum(periodic_depreciation, axis=1),
+        'periodic_depreciation': periodic_depreciation,
+    }
+
+
+def double_declining_balance_depreciation(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+    factor: np.ndarray = 2.0,
+) -> dict[str, np.ndarray]:
+    '''
+    Calculates the depreciation of many assets using double declining balance.
+    Results are 2-D arrays of shape (assets, periods + 1), where assets with shorter lives hold their final value and
+    zero depreciation after their last period.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets, must be greater than 0
+            factor (array_like): The rates at which the balances decline, default 2
+
+        Returns:
+            double_declining_balance_result (dict):
+                asset_value (np.ndarray): Value of the asset at the beginning of the period
+                periodic_depreciation (np.ndarray): Depreciation of the asset at the end of the period
+    '''
+    purchase_price, salvage_value, useful_life, factor = broadcast_columns(
+        purchase_price, salvage_value, useful_life, factor
+    )
+    shape = (purchase_price.size, int(useful_life.max(initial=0)) + 1)
+    asset_value = np.empty(shape, order='F')
+    periodic_depreciation = np.zeros(shape, order='F')
+    asset_value[:, 0] = purchase_price
+    total_depreciation = np.zeros(purchase_price.size)
+    decline_rate = factor / useful_life
+
+    for period in range(1, shape[1]):
+        current_depreciation = np.maximum(
+            0,
+            np.minimum(
+                (purchase_price - total_depreciation) * decline_rate,
+                purchase_price - salvage_value - total_depreciation,
+            )
+        )
+        np.copyto(periodic_depreciation[:, period], current_depreciation, where=period <= useful_life)
+        total_depreciation += periodic_depreciation[:, period]
+        np.subtract(asset_value[:, period - 1], periodic_depreciation[:, period], out=asset_value[:, period])
+
+    return {
+        'asset_value': asset_value,
+        'periodic_depreciation': periodic_depreciation,
+    }
+
+
+def declining_balance(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+    sub_periods: np.ndarray = 12,
+) -> dict[str, np.ndarray]:
+    '''
+    Calculates the depreciation of many assets using declining balance.
+    Results are 2-D arrays of shape (assets, periods + 1), where assets with shorter schedules hold their final value
+    and zero depreciation after their last period.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets, must be greater than 0
+            sub_periods (array_like): The number of sub periods inside the first period (e.g. 12 months in one year).
+                                      Must be less than or equal to 12, default 12
+
+        Returns:
+            declining_balance_result (dict):
+                asset_value (np.ndarray): Value of the asset at the beginning of the period
+                periodic_depreciation (np.ndarray): Depreciation of the asset at the end of the period
+    '''
+    purchase_price, salvage_value, useful_life, sub_periods = broadcast_columns(
+        purchase_price, salvage_value, useful_life, sub_periods
+    )
+    rate = np.round(1 - (salvage_value / purchase_price) ** (1 / useful_life), 3)  # Excel rounds rate to 3 decimal places
+    partial_year = sub_periods != 12
+    schedule_length = useful_life + partial_year
+
+    shape = (purchase_price.size, int(schedule_length.max(initial=0)) + 1)
+    asset_value = np.empty(shape, order='F')
+    periodic_depreciation = np.zeros(shape, order='F')
+    asset_value[:, 0] = purchase_price
+
+    # First and last depreciations are special cases, prorated by the sub periods inside the first period
+    first_scale = rate * sub_periods / 12
+    last_scale = rate * (12 - sub_periods) / 12
+
+    for period in range(1, shape[1]):
+        scale = np.where(period == 1, first_scale, np.where(partial_year & (period == schedule_length), last_scale, rate))
+        np.multiply(asset_value[:, period - 1], scale, out=periodic_depreciation[:, period], where=period <= schedule_length)
+        np.subtract(asset_value[:, period - 1], periodic_depreciation[:, period], out=asset_value[:, period])
+
+    return {
+        'asset_value': asset_value,
+        'periodic_depreciation': periodic_depreciation,
+    }
@@ -0,0 +1,255 @@
+'''Array-based schedules in fixed point money amounts'''
+import numpy as np
+
+from pfinance.batch._utils import broadcast_columns
+from pfinance.batch.general import loan_payment
+
+ROUNDINGS = ('half_even', 'half_up', 'down')
+
+# Rates are taken to eight decimal places, so they multiply integer amounts as exact integer ratios
+_RATE_SCALE = 10 ** 8
+
+
+def to_fixed(values: np.ndarray, scale: int = 100, rounding: str = 'half_even') -> np.ndarray:
+    '''
+    Returns money amounts as integers counting units of 1 / scale, e.g. cents for a scale of 100.
+    Scaled amounts are first rounded to six decimal places, so binary representation error does not decide ties,
+    e.g. 1.005 is treated as exactly 100.5 cents.
+
+        Parameters:
+            values (array_like): Money amounts
+            scale (int): Number of fixed point units per unit of currency, default 100
+            rounding (str): Rounding rule, one of 'half_even' (banker's rounding), 'half_up' (ties away from zero) or
+                            'down' (towards zero), default 'half_even'
+
+        Returns:
+            fixed_values (np.ndarray): Amounts as int64 counts of fixed point units
+    '''
+    _check_rounding(rounding)
+    scaled = np.round(np.asarray(values, dtype=np.float64) * scale, 6)
+    floor = np.floor(scaled)
+    fraction = scaled - floor
+    floor = floor.astype(np.int64)
+
+    if rounding == 'half_even':
+        up = (fraction > 0.5) | ((fraction == 0.5) & (floor % 2 == 1))
+    elif rounding == 'half_up':
+        up = (fraction > 0.5) | ((fraction == 0.5) & (floor >= 0))
+    else:
+        up = (fraction > 0) & (floor < 0)
+    return floor + up
+
+
+def to_float(values: np.ndarray, scale: int = 100) -> np.ndarray:
+    '''
+    Returns fixed point money amounts as floating point amounts of currency.
+
+        Parameters:
+            values (array_like): Amounts as integer counts of fixed point units
+            scale (int): Number of fixed point units per unit of currency, default 100
+
+        Returns:
+            float_values (np.ndarray): Amounts of currency
+    '''
+    return np.asarray(values) / scale
+
+
+def loan_payment_schedule(
+    principal: np.ndarray,
+    interest_rate: np.ndarray,
+    payment_frequency: np.ndarray,
+    term: np.ndarray,
+    down_payment: np.ndarray = 0,
+    scale: int = 100,
+    rounding: str = 'half_even',
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the payment schedules for a book of loans in fixed point amounts as 2-D int64 arrays of shape
+    (loans, periods). The level payment is rounded once and each period's interest is the exact product of the
+    balance and the periodic rate rounded by the rounding rule. The final payment settles the remaining balance, so
+    every loan is repaid exactly. Loans shorter than the longest term are padded with zeros after their final payment.
+
+        Parameters:
+            principal (array_like): Initial values of the loans
+            interest_rate (array_like): Interest rates per period, e.g. year, taken to eight decimal places
+            payment_frequency (array_like): Number of payments and compoundings per period, e.g. year
+            term (array_like): Terms of the loans in number of payments
+            down_payment (array_like): Amounts paid towards the loans before interest, default 0
+            scale (int): Number of fixed point units per unit of currency, default 100
+            rounding (str): Rounding rule, one of 'half_even', 'half_up' or 'down', default 'half_even'
+
+        Returns:
+            loan_payment_schedule (dict):
+                payment (np.ndarray): Loan payment, which differs from the level payment in the final period
+                principal_payment (np.ndarray): Portion of the loan payment used to pay the principal
+                interest_payment (np.ndarray): Portion of the loan payment used to pay the interest
+                remaining_balance (np.ndarray): Remaining loan balance after payment
+    '''
+    principal, interest_rate, payment_frequency, term, down_payment = broadcast_columns(
+        principal, interest_rate, payment_frequency, term, down_payment
+    )
+    level_payment = to_fixed(loan_payment(principal, interest_rate, payment_frequency, term, down_payment), scale, rounding)
+    balance = to_fixed(principal, scale, rounding) - to_fixed(down_payment, scale, rounding)
+    rate = np.rint(interest_rate * _RATE_SCALE).astype(np.int64)
+    denominator = np.rint(payment_frequency * _RATE_SCALE).astype(np.int64)
+    _check_overflow(balance, rate)
+
+    term = term.astype(np.int64)
+    shape = (balance.size, int(term.max(initial=0)))
+    payment = np.zeros(shape, dtype=np.int64, order='F')
+    principal_payment = np.zeros(shape, dtype=np.int64, order='F')
+    interest_payment = np.zeros(shape, dtype=np.int64, order='F')
+    remaining_balance = np.zeros(shape, dtype=np.int64, order='F')
+
+    for period in range(shape[1]):
+        active = period < term
+        interest = np.where(active, _divide(balance * rate, denominator, rounding), 0)
+        paid = np.where(period == term - 1, balance, np.where(active, level_payment - interest, 0))
+        balance = balance - paid
+        interest_payment[:, period] = interest
+        principal_payment[:, period] = paid
+        payment[:, period] = interest + paid
+        remaining_balance[:, period] = np.where(active, balance, 0)
+
+    return {
+        'payment': payment,
+        'principal_payment': principal_payment,
+        'interest_payment': interest_payment,
+        'remaining_balance': remaining_balance,
+    }
+
+
+def sum_of_years_depreciation(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+    scale: int = 100,
+    rounding: str = 'half_even',
+) -> dict[str, np.ndarray]:
+    '''
+    Calculates the depreciation of many assets using sum of years depreciation in fixed point amounts.
+    Each period's depreciation is an exact integer ratio rounded by the rounding rule, and the final period absorbs the
+    accumulated rounding residual, so every asset ends at exactly its salvage value. Results are 2-D int64 arrays of
+    shape (assets, periods + 1), where assets with shorter lives hold their final value and zero depreciation after
+    their last period.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets, must be greater than 0
+            scale (int): Number of fixed point units per unit of currency, default 100
+            rounding (str): Rounding rule, one of 'half_even', 'half_up' or 'down', default 'half_even'
+
+        Returns:
+            sum_of_years_result (dict):
+                asset_value (np.ndarray): Value of the asset at the beginning of the period
+                periodic_depreciation (np.ndarray): Depreciation of the asset at the end of the period
+    '''
+    purchase_price, salvage_value, useful_life = broadcast_columns(purchase_price, salvage_value, useful_life)
+    purchase_price = to_fixed(purchase_price, scale, rounding)
+    depreciable = purchase_price - to_fixed(salvage_value, scale, rounding)
+    useful_life = useful_life.astype(np.int64)
+    _check_overflow(depreciable, useful_life)
+
+    period = np.arange(int(useful_life.max(initial=0)) + 1)
+    remaining_life = useful_life[:, None] - period + 1
+    periodic_depreciation = np.where(
+        (period > 0) & (remaining_life > 0),
+        _divide(depreciable[:, None] * remaining_life, (useful_life * (useful_life + 1) // 2)[:, None], rounding),
+        0,
+    )
+
+    # Settle the rounding residual in the final period
+    last = np.arange(useful_life.size), useful_life
+    periodic_depreciation[last] += depreciable - periodic_depreciation.sum(axis=1)
+
+    return {
+        'asset_value': purchase_price[:, None] - np.cumsum(periodic_depreciation, axis=1),
+        'periodic_depreciation': periodic_depreciation,
+    }
+
+
+def double_declining_balance_depreciation(
+    purchase_price: np.ndarray,
+    salvage_value: np.ndarray,
+    useful_life: np.ndarray,
+    factor: np.ndarray = 2.0,
+    scale: int = 100,
+    rounding: str = 'half_even',
+) -> dict[str, np.ndarray]:
+    '''
+    Calculates the depreciation of many assets using double declining balance in fixed point amounts.
+    Each period's depreciation is the exact product of the asset value and the decline rate rounded by the rounding
+    rule, and never takes the asset below its salvage value. Results are 2-D int64 arrays of shape
+    (assets, periods + 1), where assets with shorter lives hold their final value and zero depreciation after their
+    last period. The decline rate factor / useful_life is kept as a fraction in lowest terms, and the fixed point
+    purchase prices times its numerator must stay below 2 ** 63, e.g. about 46 quadrillion units of currency for a
+    factor of 2 at a scale of 100, but only about 460 million for a factor of 2.00000001. Larger amounts raise
+    OverflowError.
+
+        Parameters:
+            purchase_price (array_like): The total amounts paid for the assets
+            salvage_value (array_like): The values of the assets after their useful life
+            useful_life (array_like): The expected lifespans of the assets, must be greater than 0
+            factor (array_like): The rates at which the balances decline, taken to eight decimal places, default 2
+            scale (int): Number of fixed point units per unit of currency, default 100
+            rounding (str): Rounding rule, one of 'half_even', 'half_up' or 'down', default 'half_even'
+
+        Returns:
+            double_declining_balance_result (dict):
+                asset_value (np.ndarray): Value of the asset at the beginning of the period
+                periodic_depreciation (np.ndarray): Depreciation of the asset at the end of the period
+    '''
+    purchase_price, salvage_value, useful_life, factor = broadcast_columns(
+        purchase_price, salvage_value, useful_life, factor
+    )
+    asset_value = to_fixed(purchase_price, scale, rounding)
+    salvage_value = to_fixed(salvage_value, scale, rounding)
+    useful_life = useful_life.astype(np.int64)
+    # Reduce each decline rate factor / useful_life to lowest terms, so the usual factors multiply by small integers
+    rate = np.rint(factor * _RATE_SCALE).astype(np.int64)
+    denominator = useful_life * _RATE_SCALE
+    divisor = np.maximum(np.gcd(rate, denominator), 1)
+    rate, denominator = rate // divisor, denominator // divisor
+    _check_overflow(asset_value, rate)
+
+    shape = (asset_value.size, int(useful_life.max(initial=0)) + 1)
+    values = np.empty(shape, dtype=np.int64, order='F')
+    periodic_depreciation = np.zeros(shape, dtype=np.int64, order='F')
+    values[:, 0] = asset_value
+
+    for period in range(1, shape[1]):
+        depreciation = np.clip(_divide(asset_value * rate, denominator, rounding), 0, asset_value - salvage_value)
+        depreciation = np.where(period <= useful_life, np.maximum(depreciation, 0), 0)
+        asset_value = asset_value - depreciation
+        periodic_depreciation[:, period] = depreciation
+        values[:, period] = asset_value
+
+    return {
+        'asset_value': values,
+        'periodic_depreciation': periodic_depreciation,
+    }
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray, rounding: str) -> np.ndarray:
+    # Returns numerator / denominator rounded to an integer by the rounding rule, for positive integer denominators.
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    if rounding == 'half_even':
+        up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    elif rounding == 'half_up':
+        up = (twice > denominator) | ((twice == denominator) & (numerator >= 0))
+    else:
+        up = (remainder > 0) & (numerator < 0)
+    return quotient + up
+
+
+def _check_rounding(rounding: str):
+    if rounding not in ROUNDINGS:
+        raise ValueError(f'rounding must be one of {ROUNDINGS}, not {rounding!r}')
+
+
+def _check_overflow(amounts: np.ndarray, multipliers: np.ndarray):
+    # Products of amounts and multipliers must fit in int64 for the integer arithmetic to stay exact.
+    if amounts.size and float(np.abs(amounts).max()) * float(np.abs(multipliers).max(initial=0)) >= 2.0 ** 63:
+        raise OverflowError('amounts are too large for the fixed point scale')
@@ -0,0 +1,183 @@
+'''Array-based common finance functions'''
+import numpy as np
+
+from pfinance.batch._utils import as_float_array, broadcast_columns, compensated_sum, two_product
+
+
+def loan_payment(
+    principal: np.ndarray,
+    interest_rate: np.ndarray,
+    payment_frequency: np.ndarray,
+    term: np.ndarray,
+    down_payment: np.ndarray = 0,
+) -> np.ndarray:
+    '''
+    Returns the periodic payments required to repay loans accruing compound interest.
+    Inputs are broadcast against each other, so scalars and arrays may be mixed.
+
+        Parameters:
+            principal (array_like): Initial values of the loans
+            interest_rate (array_like): Interest rates per period, e.g. year
+            payment_frequency (array_like): Number of payments and compoundings per period, e.g. year
+            term (array_like): Terms of the loans in number of payments
+            down_payment (array_like): Amounts paid towards the loans before interest, default 0
+
+        Returns:
+            periodic_payment (np.ndarray): Period loan payments
+    '''
+    principal, interest_rate, payment_frequency, term, down_payment = np.broadcast_arrays(
+        *(np.asarray(arg, dtype=np.float64) for arg in (principal, interest_rate, payment_frequency, term, down_payment))
+    )
+    loan_amount = principal - down_payment
+    zero_rate = interest_rate == 0
+
+    # Substitute a harmless rate for zero rate loans so the annuity formula never divides by zero
+    effective_rate = np.where(zero_rate, 1.0, interest_rate / payment_frequency)
+    growth = (1 + effective_rate) ** term
+    payment = loan_amount * effective_rate * growth / (growth - 1)
+
+    return np.where(zero_rate, loan_amount / term, payment)
+
+
+def loan_payment_schedule(
+    principal: np.ndarray,
+    interest_rate: np.ndarray,
+    payment_frequency: np.ndarray,
+    term: np.ndarray,
+    down_payment: np.ndarray = 0,
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the payment schedules for a book of loans as 2-D arrays of shape (loans, periods).
+    Loans shorter than the longest term are padded with zeros after their final payment.
+
+        Parameters:
+            principal (array_like): Initial values of the loans
+            interest_rate (array_like): Interest rates per period, e.g. year
+            payment_frequency (array_like): Number of payments and compoundings per period, e.g. year
+            term (array_like): Terms of the loans in number of payments
+            down_payment (array_like): Amounts paid towards the loans before interest, default 0
+
+        Returns:
+            loan_payment_schedule (dict):
+                principal_payment (np.ndarray): Portion of the loan payment used to pay the principal
+                interest_payment (np.ndarray): Portion of the loan payment used to pay the interest
+                remaining_balance (np.ndarray): Remaining loan balance after payment
+    '''
+    principal, interest_rate, payment_frequency, term, down_payment = broadcast_columns(
+        principal, interest_rate, payment_frequency, term, down_payment
+    )
+    payment = loan_payment(principal, interest_rate, payment_frequency, term, down_payment)
+    periodic_rate = interest_rate / payment_frequency
+    term = term.astype(np.int64)
+    shape = (payment.size, int(term.max(initial=0)))
+
+    # Column major buffers keep each period's column contiguous while the loop fills them
+    principal_payment = np.zeros(shape, order='F')
+    interest_payment = np.zeros(shape, order='F')
+    remaining_balance = np.zeros(shape, order='F')
+    loan_amount = principal - down_payment
+
+    for period in range(shape[1]):
+        active = period < term
+        interest = interest_payment[:, period]
+        paid = principal_payment[:, period]
+        np.multiply(loan_amount, periodic_rate, out=interest, where=active)
+        np.subtract(payment, interest, out=paid, where=active)
+        np.subtract(loan_amount, paid, out=loan_amount)
+        np.copyto(remaining_balance[:, period], loan_amount, where=active)
+
+    return {
+        'principal_payment': principal_payment,
+        'interest_payment': interest_payment,
+        'remaining_balance': remaining_balance,
+    }
+
+
+def sum_product(*arrays: np.ndarray, compensated: bool = False) -> np.ndarray:
+    '''
+    Returns the sum of arrays multiplied by eachother along their last axis. Arrays with more than one dimension give
+    one sum per vector, e.g. the dot products of many vector pairs.
+
+        Parameters:
+            *arrays (array_like): Any number of arrays or buffer protocol objects to be multiplied and summed together.
+                                  float64 inputs are used without copying
+            compensated (bool): Use error free transformations for the final multiplication and the summation, which is
+                                as accurate as computing in twice the working precision, default False
+
+        Returns:
+            total_sum (np.ndarray): Total sum of the arrays multiplied together. None if the last axes have different
+                                    lengths or no arrays passed in
+    '''
+    arrays = [as_float_array(array) for array in arrays]
+    if len({array.shape[-1:] for array in arrays}) != 1:
+        return None
+
+    if len(arrays) == 1:
+        return compensated_sum(arrays[0]) if compensated else arrays[0].sum(axis=-1)
+
+    multiplied = arrays[0]
+    for array in arrays[1:-1]:
+        multiplied = multiplied * array
+
+    if not compensated:
+        return np.einsum('...i,...i->...', multiplied, arrays[-1])
+
+    product, rounding = two_product(*np.broadcast_arrays(multiplied, arrays[-1]))
+    return compensated_sum(np.concatenate([product, rounding], axis=-1))
+
+
+def sum_squares(vals: np.ndarray, compensated: bool = False) -> np.ndarray:
+    '''
+    Returns the sum of the square of each value along the last axis of an array.
+
+        Parameters:
+            vals (array_like): Array or buffer protocol object of values
+            compensated (bool): Use error free transformations for the squares and the summation, default False
+
+        Returns:
+            total_sum (np.ndarray): Sum of squares of values
+    '''
+    vals = as_float_array(vals)
+    return sum_product(vals, vals, compensated=compensated)
+
+
+def sum_diff_squares(lst1: np.ndarray, lst2: np.ndarray, compensated: bool = False) -> np.ndarray:
+    '''
+    Returns the sum of the difference of squares of the values in two arrays along their last axis.
+
+        Parameters:
+            lst1 (array_like): Array one of values
+            lst2 (array_like): Array two of values
+            compensated (bool): Use error free transformations for the squares and the summation, default False
+
+        Returns:
+            total_sum (np.ndarray): Sum of difference of squares of values
+    '''
+    lst1, lst2 = as_float_array(lst1), as_float_array(lst2)
+    if not compensated:
+        return np.einsum('...i,...i->...', lst1, lst1) - np.einsum('...i,...i->...', lst2, lst2)
+
+    square1, rounding1 = two_product(lst1, lst1)
+    square2, rounding2 = two_product(lst2, lst2)
+    return compensated_sum(np.concatenate(np.broadcast_arrays(square1, -square2, rounding1, -rounding2), axis=-1))
+
+
+def weighted_sum(values: np.ndarray, weights: np.ndarray, compensated: bool = False) -> np.ndarray:
+    '''
+    Returns the weighted sum of values along their last axis, with one set of weights broadcast across every vector.
+    For example, position sizes of shape (portfolios, positions) and exposures of shape (positions,) give the total
+    exposure of each portfolio.
+
+        Parameters:
+            values (array_like): Array or buffer protocol object of values
+            weights (array_like): Weights of the values, broadcastable to the shape of values
+            compensated (bool): Use error free transformations for the products and the summation, default False
+
+        Returns:
+            total_sum (np.ndarray): Weighted sum of the values
+    '''
+    values, weights = as_float_array(values), as_float_array(weights)
+    if not compensated and weights.ndim == 1:
+        return values @ weights
+
+    return sum_product(*np.broadcast_arrays(values, weights), compensated=compensated)
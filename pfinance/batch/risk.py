@@ -0,0 +1,84 @@
+'''Array-based interest rate risk functions'''
+import numpy as np
+
+from pfinance.batch.curves import curve_arrays, discount_factors
+from pfinance.curves import yield_curve
+
+
+def key_rate_durations(
+    cash_flows: np.ndarray,
+    curve: yield_curve,
+    key_tenors: np.ndarray = None,
+    times: np.ndarray = None,
+    bump: float = 0.0001,
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the key rate durations and DV01 of many cash flow streams discounted on a yield curve.
+    Each key rate is bumped up and down by a triangular shift of the zero rates, which is largest at its key tenor and
+    falls to zero at the neighbouring key tenors, with the first and last shifts held flat beyond the ends. The base
+    discount factors are computed once and each bump multiplies only the factors inside its triangle, so the work per
+    bump grows with the number of cash flows it affects rather than with the whole schedule.
+
+        Parameters:
+            cash_flows (array_like): 2-D array of cash flows with one stream per row and one column per time
+            curve (yield_curve): Yield curve the cash flows are discounted on
+            key_tenors (array_like): Strictly increasing tenors of the key rates, default None for the curve tenors
+            times (array_like): Increasing times of the cash flow columns in curve periods, default None for 1, 2, 3...
+            bump (float): Size of the zero rate shift at a key tenor, default 0.0001 (one basis point)
+
+        Returns:
+            key_rate_result (dict):
+                value (np.ndarray): Present value of each stream
+                key_rate_dv01 (np.ndarray): Decrease in value of each stream per basis point rise of each key rate,
+                                            with one column per key tenor
+                key_rate_duration (np.ndarray): Key rate DV01 relative to the value, per unit change in the key rate
+                dv01 (np.ndarray): Decrease in value per basis point parallel rise, the sum of the key rate DV01s
+    '''
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    times = np.arange(1.0, cash_flows.shape[1] + 1) if times is None else np.asarray(times, dtype=np.float64)
+    keys = curve_arrays(curve)[0] if key_tenors is None else np.asarray(key_tenors, dtype=np.float64)
+    if times.shape != cash_flows.shape[1:] or np.any(np.diff(times) < 0):
+        raise ValueError('times must be increasing with one time per cash flow column')
+    if keys.size == 0 or np.any(np.diff(keys) <= 0):
+        raise ValueError('key tenors must be non-empty and strictly increasing')
+
+    base = discount_factors(curve, times)
+    value = cash_flows @ base
+    shift = np.zeros((cash_flows.shape[0], keys.size))
+
+    # Only cash flows after time 0 are discounted, so only they respond to a bump
+    first = np.searchsorted(times, 0, side='right')
+    with np.errstate(divide='ignore'):
+        growth = base ** (-1 / times)  # One plus the interpolated zero rate at each time
+
+    for k, key in enumerate(keys):
+        lower = keys[k - 1] if k > 0 else -np.inf
+        upper = keys[k + 1] if k < keys.size - 1 else np.inf
+        start = max(np.searchsorted(times, lower, side='right'), first)
+        stop = np.searchsorted(times, upper, side='left')
+        if start >= stop:
+            continue
+
+        t = times[start:stop]
+        weight = np.ones_like(t)
+        if k > 0:
+            weight = np.where(t < key, (t - lower) / (key - lower), weight)
+        if k < keys.size - 1:
+            weight = np.where(t > key, (upper - t) / (upper - key), weight)
+
+        # Rebase the bumped discount factors on the base factors instead of rebuilding them from the curve
+        g = growth[start:stop]
+        down = (g / (g - bump * weight)) ** t
+        up = (g / (g + bump * weight)) ** t
+        shift[:, k] = cash_flows[:, start:stop] @ (base[start:stop] * (down - up))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        key_rate_duration = shift / (2 * bump * value[:, None])
+
+    key_rate_dv01 = shift * (0.0001 / (2 * bump))
+    return {
+        'value': value,
+        'key_rate_dv01': key_rate_dv01,
+        'key_rate_duration': key_rate_duration,
+        'dv01': key_rate_dv01.sum(axis=1),
+    }
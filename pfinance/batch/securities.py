@@ -0,0 +1,281 @@
+'''Array-based securities tracking and analysis functions'''
+import numpy as np
+
+GAMBIT_DTYPE = np.dtype([
+    ('base_value', np.float64),
+    ('base_gain', np.float64),
+    ('converted_value', np.float64),
+    ('converted_gain', np.float64),
+])
+
+
+def norberts_gambit(
+    quantity: np.ndarray,
+    purchase_price: np.ndarray,
+    sale_price: np.ndarray,
+    rate: np.ndarray = 1,
+    purchase_commission: np.ndarray = 0,
+    sale_commission: np.ndarray = 0,
+) -> np.ndarray:
+    '''
+    Returns the converted values and capital gains of many executions of Norbert's Gambit.
+    Inputs are broadcast against each other, so full grids of scenarios can be evaluated with open meshes such as
+    those returned by np.ix_.
+
+        Parameters:
+            quantity (array_like): Number of securities transacted
+            purchase_price (array_like): Unit price of the purchased securities
+            sale_price (array_like): Unit price of the sold securities
+            rate (array_like): Exchange rate between the purchasing currency and the sale currency expressed as a
+                               multiplier of the purchasing currency, default 1
+            purchase_commission (array_like): Commission paid in the purchasing currency on the purchase transaction,
+                                              default 0
+            sale_commission (array_like): Commission paid in the sale currency on the sale transaction, default 0
+
+        Returns:
+            gambit_result (np.ndarray): Structured array with fields:
+                base_value (float): Final value of the conversion expressed in the purchase currency
+                base_gain (float): Capital gain of the conversion expressed in the purchase currency
+                converted_value (float): Final value of the conversion expressed in the sale currency
+                converted_gain (float): Capital gain of the conversion expressed in the sale currency
+    '''
+    initial_value, final_value = _gambit_values(quantity, purchase_price, sale_price, purchase_commission, sale_commission)
+    initial_value, final_value, rate = np.broadcast_arrays(initial_value, final_value, np.asarray(rate, dtype=np.float64))
+
+    result = np.empty(rate.shape, dtype=GAMBIT_DTYPE)
+    np.divide(final_value, rate, out=result['base_value'])
+    np.subtract(result['base_value'], initial_value, out=result['base_gain'])
+    result['converted_value'] = final_value
+    np.subtract(final_value, initial_value * rate, out=result['converted_gain'])
+
+    return result
+
+
+def break_even_rate(
+    quantity: np.ndarray,
+    purchase_price: np.ndarray,
+    sale_price: np.ndarray,
+    purchase_commission: np.ndarray = 0,
+    sale_commission: np.ndarray = 0,
+) -> np.ndarray:
+    '''
+    Returns the exchange rates at which executions of Norbert's Gambit neither gain nor lose value.
+    At this rate both the base and converted gains are zero, so it is solved directly rather than by iteration.
+
+        Parameters:
+            quantity (array_like): Number of securities transacted
+            purchase_price (array_like): Unit price of the purchased securities
+            sale_price (array_like): Unit price of the sold securities
+            purchase_commission (array_like): Commission paid in the purchasing currency on the purchase transaction,
+                                              default 0
+            sale_commission (array_like): Commission paid in the sale currency on the sale transaction, default 0
+
+        Returns:
+            rate (np.ndarray): Break even exchange rate, NaN where nothing is invested
+    '''
+    initial_value, final_value = _gambit_values(quantity, purchase_price, sale_price, purchase_commission, sale_commission)
+    initial_value, final_value = np.broadcast_arrays(initial_value, final_value)
+
+    return np.divide(final_value, initial_value, out=np.full(initial_value.shape, np.nan), where=initial_value != 0)
+
+
+def _gambit_values(quantity, purchase_price, sale_price, purchase_commission, sale_commission):
+    # Returns the value invested in the purchase currency and the value received in the sale currency.
+    quantity = np.asarray(quantity, dtype=np.float64)
+    initial_value = quantity * purchase_price - np.asarray(purchase_commission, dtype=np.float64)
+    final_value = quantity * sale_price - np.asarray(sale_commission, dtype=np.float64)
+    return initial_value, final_value
+
+
+def alpha(actual_rate_of_return: np.ndarray, expected_rate_of_return: np.ndarray) -> np.ndarray:
+    '''
+    Returns the alpha coefficients for arrays of actual and expected rates of return.
+
+        Parameters:
+            actual_rate_of_return (array_like): Rates of return achieved
+            expected_rate_of_return (array_like): Rates of return expected
+
+        Returns:
+            alpha (np.ndarray): Highest return possible from a minimum amount of investment risk
+    '''
+    return np.subtract(actual_rate_of_return, expected_rate_of_return, dtype=np.float64)
+
+
+def expected_rate_of_return(
+    risk_free_rate: np.ndarray,
+    beta: np.ndarray,
+    market_risk_premium: np.ndarray,
+) -> np.ndarray:
+    '''
+    Returns the expected rates of return for arrays of betas and market conditions.
+
+        Parameters:
+            risk_free_rate (array_like): Theoretical rate of return for an investment with 0 risk
+            beta (array_like): Volatility of an investment compared to the market as a whole
+            market_risk_premium (array_like): Premium on return paid for risk on an investment
+
+        Returns:
+            expected_rate_of_return (np.ndarray): Rate of return expected for an investment
+    '''
+    return np.asarray(risk_free_rate, dtype=np.float64) + np.multiply(beta, market_risk_premium)
+
+
+def rolling_beta(returns: np.ndarray, benchmark_returns: np.ndarray, window: int) -> np.ndarray:
+    '''
+    Returns the beta of many securities against a benchmark over a rolling window of periods.
+    Window sums are maintained as differences of running sums, so each step costs O(1) regardless of the window.
+
+        Parameters:
+            returns (array_like): Returns of shape (periods, securities), or (periods,) for a single security
+            benchmark_returns (array_like): Benchmark returns of shape (periods,)
+            window (int): Number of periods in each estimation window, must be at least 2
+
+        Returns:
+            beta (np.ndarray): Beta over the window ending at each period, NaN for the first window - 1 periods
+    '''
+    returns = np.asarray(returns, dtype=np.float64)
+    benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+    market = benchmark_returns.reshape(benchmark_returns.shape + (1,) * (returns.ndim - 1))
+
+    # Covariances are unchanged by shifting each series, and centering keeps the running sums from losing precision
+    y = returns - returns.mean(axis=0)
+    x = market - market.mean(axis=0)
+
+    def window_sums(values):
+        running = np.cumsum(values, axis=0)
+        running[window:] = running[window:] - running[:-window]
+        return running
+
+    sum_x, sum_y = window_sums(x), window_sums(y)
+    sum_xy, sum_xx = window_sums(x * y), window_sums(x * x)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = (window * sum_xy - sum_x * sum_y) / (window * sum_xx - sum_x * sum_x)
+    beta[:window - 1] = np.nan
+    return beta
+
+
+def capm_analytics(
+    returns: np.ndarray,
+    benchmark_returns: np.ndarray,
+    risk_free_rate: np.ndarray,
+    window: int,
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the rolling beta, expected rate of return and alpha of many securities at every period.
+    The expected rate of return uses the beta of the window ending at the period and the benchmark's realized premium
+    over the risk free rate in that period.
+
+        Parameters:
+            returns (array_like): Returns of shape (periods, securities), or (periods,) for a single security
+            benchmark_returns (array_like): Benchmark returns of shape (periods,)
+            risk_free_rate (array_like): Risk free rate, either constant or of shape (periods,)
+            window (int): Number of periods in each beta estimation window, must be at least 2
+
+        Returns:
+            capm_result (dict):
+                beta (np.ndarray): Beta over the window ending at each period
+                expected_rate_of_return (np.ndarray): Rate of return expected for each security and period
+                alpha (np.ndarray): Return in excess of the expected rate of return
+    '''
+    returns = np.asarray(returns, dtype=np.float64)
+    extra_axes = (1,) * (returns.ndim - 1)
+    benchmark_returns = np.asarray(benchmark_returns, dtype=np.float64)
+    risk_free_rate = np.broadcast_to(np.asarray(risk_free_rate, dtype=np.float64), benchmark_returns.shape)
+
+    beta = rolling_beta(returns, benchmark_returns, window)
+    expected = expected_rate_of_return(
+        risk_free_rate.reshape(risk_free_rate.shape + extra_axes),
+        beta,
+        (benchmark_returns - risk_free_rate).reshape(benchmark_returns.shape + extra_axes),
+    )
+
+    return {
+        'beta': beta,
+        'expected_rate_of_return': expected,
+        'alpha': alpha(returns, expected),
+    }
+
+
+def binomial_option_price(
+    spot_price: np.ndarray,
+    strike_price: np.ndarray,
+    risk_free_rate: np.ndarray,
+    volatility: np.ndarray,
+    expiry: np.ndarray,
+    steps: int = 500,
+    call: np.ndarray = True,
+    american: bool = False,
+    dividend_yield: np.ndarray = 0,
+) -> np.ndarray:
+    '''
+    Returns the prices of many options using Cox-Ross-Rubinstein binomial trees with the same number of steps.
+    European options are priced in closed form as a binomial sum. American options are priced by backward induction
+    over one row of node values per option, so memory grows with options x steps rather than options x steps ** 2.
+
+        Parameters:
+            spot_price (array_like): Current prices of the underlying securities
+            strike_price (array_like): Prices at which the options can be exercised
+            risk_free_rate (array_like): Continuously compounded risk free rates per year
+            volatility (array_like): Annualized volatilities of the underlying securities' returns
+            expiry (array_like): Times to expiry in years, must be greater than 0
+            steps (int): Number of time steps in every tree, default 500
+            call (array_like): Price call options, otherwise put options, default True
+            american (bool): Allow exercise before expiry, default False
+            dividend_yield (array_like): Continuously compounded dividend yields per year, default 0
+
+        Returns:
+            option_price (np.ndarray): Present values of the options
+    '''
+    spot_price, strike_price, risk_free_rate, volatility, expiry, call, dividend_yield = np.broadcast_arrays(
+        *(np.asarray(arg, dtype=np.float64)
+          for arg in (spot_price, strike_price, risk_free_rate, volatility, expiry, call, dividend_yield))
+    )
+    shape = spot_price.shape
+    spot_price, strike_price, risk_free_rate, volatility, expiry, call, dividend_yield = (
+        column.ravel()[:, None]
+        for column in (spot_price, strike_price, risk_free_rate, volatility, expiry, call, dividend_yield)
+    )
+
+    dt = expiry / steps
+    log_up = volatility * np.sqrt(dt)
+    up, down = np.exp(log_up), np.exp(-log_up)
+    discount = np.exp(-risk_free_rate * dt)
+    p = (np.exp((risk_free_rate - dividend_yield) * dt) - down) / (up - down)
+    sign = np.where(call != 0, 1.0, -1.0)
+    k = np.arange(steps + 1)
+
+    payoff = np.maximum(sign * (spot_price * np.exp(log_up * (2 * k - steps)) - strike_price), 0)
+    if not american:
+        # Binomial coefficients in log space, accumulated from ln(n choose k + 1) = ln(n choose k) + ln((n - k) / (k + 1))
+        log_binomial = np.concatenate([[0.0], np.cumsum(np.log(steps - k[:-1]) - np.log(k[:-1] + 1))])
+        # A probability of 0 or 1 leaves a single reachable node, so 0 * log(0) terms are taken as 0 rather than NaN
+        with np.errstate(divide='ignore', invalid='ignore'):
+            up_term = np.where(k == 0, 0.0, k * np.log(p))
+            down_term = np.where(k == steps, 0.0, (steps - k) * np.log1p(-p))
+        log_probability = log_binomial + up_term + down_term
+        price = (np.exp(log_probability) * payoff).sum(axis=1) * discount[:, 0] ** steps
+        return price.reshape(shape)
+
+    # Node k of step i is priced at spot * up ** (2k - i), which is node k + 1 of step i + 2, so the final two rows of
+    # signed node prices cover every earlier step as slices and no powers are recomputed inside the induction.
+    # Nodes run along the first axis so each step works on one contiguous block of memory.
+    signed_strike = (sign * strike_price).T
+    signed_prices = (
+        (sign * spot_price * np.exp(log_up * (2 * k - steps))).T - signed_strike,
+        (sign * spot_price * np.exp(log_up * (2 * k[:-1] - steps + 1))).T - signed_strike,
+    )
+    up_weight, down_weight = (discount * p).T, (discount * (1 - p)).T
+    values = np.ascontiguousarray(payoff.T)
+    continuation = np.empty_like(values)
+
+    for step in range(steps - 1, -1, -1):
+        offset = (steps - step) // 2
+        exercise = signed_prices[(steps - step) % 2][offset:offset + step + 1]
+        current = values[:step + 1]
+        np.multiply(values[1:step + 2], up_weight, out=continuation[:step + 1])
+        current *= down_weight
+        current += continuation[:step + 1]
+        np.maximum(current, exercise, out=current)
+
+    return values[0].reshape(shape)
@@ -0,0 +1,171 @@
+'''Monte Carlo simulation of stochastic interest rates'''
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class vasicek_model:
+    '''
+    Represents a Vasicek short rate model, sampled with its exact discretization.
+    All parameters are expressed per period, matching the interest schedules of future_value_schedule.
+    '''
+    def __init__(self, initial_rate: float, mean_reversion: float, long_term_rate: float, volatility: float):
+        '''
+        Constructs the necessary attributes for the Vasicek model object.
+
+        Parameters:
+            initial_rate (float): Interest rate of the first period
+            mean_reversion (float): Speed at which the rate reverts to its long term level, must be greater than 0
+            long_term_rate (float): Level the rate reverts to
+            volatility (float): Volatility of the rate
+        '''
+        self.initial_rate = initial_rate
+        self.mean_reversion = mean_reversion
+        self.long_term_rate = long_term_rate
+        self.volatility = volatility
+
+    def __call__(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        decay = np.exp(-self.mean_reversion)
+        shock = self.volatility * np.sqrt((1 - decay ** 2) / (2 * self.mean_reversion))
+        noise = rng.standard_normal((paths, periods - 1))
+        rates = np.empty((paths, periods))
+        rates[:, 0] = self.initial_rate
+        for period in range(1, periods):
+            rates[:, period] = (
+                rates[:, period - 1] * decay + self.long_term_rate * (1 - decay) + shock * noise[:, period - 1]
+            )
+        return rates
+
+
+class cir_model:
+    '''
+    Represents a Cox-Ingersoll-Ross short rate model, sampled with a full truncation Euler scheme.
+    All parameters are expressed per period, matching the interest schedules of future_value_schedule.
+    '''
+    def __init__(self, initial_rate: float, mean_reversion: float, long_term_rate: float, volatility: float):
+        '''
+        Constructs the necessary attributes for the Cox-Ingersoll-Ross model object.
+
+        Parameters:
+            initial_rate (float): Interest rate of the first period
+            mean_reversion (float): Speed at which the rate reverts to its long term level
+            long_term_rate (float): Level the rate reverts to
+            volatility (float): Volatility of the rate, scaled by the square root of the rate
+        '''
+        self.initial_rate = initial_rate
+        self.mean_reversion = mean_reversion
+        self.long_term_rate = long_term_rate
+        self.volatility = volatility
+
+    def __call__(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        noise = rng.standard_normal((paths, periods - 1))
+        state = np.full(paths, float(self.initial_rate))
+        rates = np.empty((paths, periods))
+        rates[:, 0] = np.maximum(state, 0)
+        for period in range(1, periods):
+            positive = np.maximum(state, 0)
+            state = (
+                state + self.mean_reversion * (self.long_term_rate - positive)
+                + self.volatility * np.sqrt(positive) * noise[:, period - 1]
+            )
+            rates[:, period] = np.maximum(state, 0)
+        return rates
+
+
+class bootstrap_model:
+    '''
+    Represents rate paths resampled, with replacement, from a history of per period rates.
+    '''
+    def __init__(self, historical_rates: np.ndarray, block_size: int = 1):
+        '''
+        Constructs the necessary attributes for the bootstrap model object.
+
+        Parameters:
+            historical_rates (array_like): Observed interest rates per period
+            block_size (int): Number of consecutive historical periods drawn together, which preserves short term
+                              autocorrelation, default 1
+        '''
+        self.historical_rates = np.asarray(historical_rates, dtype=np.float64)
+        self.block_size = block_size
+
+    def __call__(self, rng: np.random.Generator, paths: int, periods: int) -> np.ndarray:
+        blocks = -(-periods // self.block_size)
+        starts = rng.integers(0, self.historical_rates.size - self.block_size + 1, size=(paths, blocks))
+        indices = (starts[:, :, None] + np.arange(self.block_size)).reshape(paths, -1)[:, :periods]
+        return self.historical_rates[indices]
+
+
+def simulate_future_value(
+    principal: float,
+    model,
+    periods: int,
+    paths: int,
+    seed: int = None,
+    chunk_size: int = 100_000,
+    workers: int = None,
+    percentiles: tuple[float, ...] = (5, 25, 50, 75, 95),
+) -> dict:
+    '''
+    Returns the distribution of the future value of an investment under simulated interest rate paths.
+    Paths are generated and compounded in chunks so only one chunk of rate paths is held in memory per worker. Each
+    chunk draws from its own seed spawned from the root seed, so results do not depend on the number of workers.
+
+        Parameters:
+            principal (float): The initial investment sum
+            model (callable): Rate model called as model(rng, paths, periods) returning per period rates of shape
+                              (paths, periods), e.g. vasicek_model, cir_model or bootstrap_model. Must be picklable
+                              when workers is greater than 1
+            periods (int): Number of periods in each path
+            paths (int): Number of paths to simulate, must be greater than 0
+            seed (int): Root seed of the numpy.random.Generator streams, default None for fresh entropy
+            chunk_size (int): Number of paths simulated at once, default 100000
+            workers (int): Number of worker processes, default None to simulate in the calling process
+            percentiles (tuple[float]): Percentiles of the future value to report, default (5, 25, 50, 75, 95)
+
+        Returns:
+            simulation_result (dict):
+                mean (float): Mean future value
+                std (float): Standard deviation of the future value
+                min (float): Lowest future value
+                max (float): Highest future value
+                percentiles (dict[float, float]): Future value at each requested percentile
+                mean_path (np.ndarray): Mean value of the investment at the end of each period
+    '''
+    if paths < 1 or chunk_size < 1:
+        raise ValueError('paths and chunk_size must be at least 1')
+
+    chunk_paths = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_paths))
+    tasks = [(principal, model, periods, n, chunk_seed) for n, chunk_seed in zip(chunk_paths, seeds)]
+
+    if workers is None or workers <= 1:
+        results = [_simulate_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_chunk, *zip(*tasks)))
+
+    future_values = np.concatenate([future_value for future_value, _ in results])
+    path_sum = np.sum([chunk_sum for _, chunk_sum in results], axis=0)
+
+    return {
+        'mean': float(future_values.mean()),
+        'std': float(future_values.std()),
+        'min': float(future_values.min()),
+        'max': float(future_values.max()),
+        'percentiles': dict(zip(percentiles, np.percentile(future_values, percentiles).tolist())),
+        'mean_path': path_sum / paths,
+    }
+
+
+def _simulate_chunk(
+    principal: float,
+    model,
+    periods: int,
+    paths: int,
+    seed: np.random.SeedSequence,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Simulates one chunk of paths, returning each path's future value and the per period sum of values across paths.
+    rates = model(np.random.default_rng(seed), paths, periods)
+    values = np.cumprod(1 + rates, axis=1)
+    values *= principal
+    return values[:, -1].copy(), values.sum(axis=0)
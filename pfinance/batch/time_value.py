@@ -0,0 +1,241 @@
+'''Array-based time value of money functions'''
+import numpy as np
+
+from pfinance.batch._utils import two_product, two_sum
+from pfinance.batch.curves import discount_factors
+from pfinance.curves import yield_curve
+from pfinance.time_value import _IRR_BRACKETS
+
+
+def present_value(
+    payment: np.ndarray,
+    interest_rate: np.ndarray,
+    periods: np.ndarray,
+    future_value: np.ndarray = 0,
+    start_of_period: np.ndarray = False,
+) -> np.ndarray:
+    '''
+    Returns the present values of loans or investments based on constant interest rates.
+    Inputs are broadcast against each other, so scalars and arrays may be mixed.
+
+        Parameters:
+            payment (array_like): The regular payments made each period
+            interest_rate (array_like): The interest rates per period, e.g. year
+            periods (array_like): Number of payments made over the terms of the investments
+            future_value (array_like): The total cash amounts you want to have at the last payment, default 0
+            start_of_period (array_like): Payments are made at start of each period, default False
+
+        Returns:
+            present_value (np.ndarray): Present values of the loans or investments
+    '''
+    payment, interest_rate, periods, future_value = np.broadcast_arrays(
+        *(np.asarray(arg, dtype=np.float64) for arg in (payment, interest_rate, periods, future_value))
+    )
+    pv_type = np.asarray(start_of_period, dtype=bool).astype(np.float64)
+    zero_rate = interest_rate == 0
+
+    # Substitute a harmless rate for zero rate rows so the annuity formula never divides by zero
+    safe_rate = np.where(zero_rate, 1.0, interest_rate)
+    growth = (1 + safe_rate) ** periods
+    numerator = payment * (1 + safe_rate * pv_type) * (growth - 1) / safe_rate + future_value
+
+    return np.where(zero_rate, (-1 * payment * periods) - future_value, -1 * numerator / growth)
+
+
+def internal_rate_of_return(
+    cash_flows: np.ndarray,
+    guess: float = 0.1,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the internal rates of return for many series of periodic cash flows solved simultaneously.
+    Each row is solved with Newton's method, falling back to bisection whenever a step leaves its bracketing interval.
+
+        Parameters:
+            cash_flows (array_like): 2-D array of cash flows with one series per row ordered chronologically. Shorter
+                                     series may be padded with trailing zeros
+            guess (float): Starting estimate of the rates, default 0.1
+            tolerance (float): Change in rate between iterations at which a solution is accepted, default 1e-10
+            max_iterations (int): Maximum number of iterations, default 100
+
+        Returns:
+            internal_rate_of_return_result (dict):
+                rate (np.ndarray): Decimal value of the IRR of each row, NaN where the row did not converge
+                converged (np.ndarray): Whether each row converged
+                iterations (np.ndarray): Number of iterations taken by each row
+    '''
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    return _solve_rates(cash_flows, np.arange(cash_flows.shape[1], dtype=np.float64), guess, tolerance, max_iterations)
+
+
+def xirr(
+    cash_flows: np.ndarray,
+    dates: np.ndarray,
+    guess: float = 0.1,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> dict[str, np.ndarray]:
+    '''
+    Returns the annual internal rates of return for many schedules of dated cash flows solved simultaneously.
+    Cash flows are discounted to the first date of their row over a 365 day year.
+
+        Parameters:
+            cash_flows (array_like): 2-D array of cash flows with one schedule per row. Shorter schedules may be padded
+                                     with zero cash flows
+            dates (array_like): Dates of the cash flows as datetime64 values or day numbers, either 2-D with one row
+                                per schedule or 1-D when all schedules share the same dates
+            guess (float): Starting estimate of the rates, default 0.1
+            tolerance (float): Change in rate between iterations at which a solution is accepted, default 1e-10
+            max_iterations (int): Maximum number of iterations, default 100
+
+        Returns:
+            xirr_result (dict):
+                rate (np.ndarray): Decimal value of the annual IRR of each row, NaN where the row did not converge
+                converged (np.ndarray): Whether each row converged
+                iterations (np.ndarray): Number of iterations taken by each row
+    '''
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        dates = dates.astype('datetime64[D]').astype(np.int64)
+    days = dates.astype(np.float64)
+
+    return _solve_rates(cash_flows, (days - days[..., :1]) / 365, guess, tolerance, max_iterations)
+
+
+def _solve_rates(
+    cash_flows: np.ndarray,
+    times: np.ndarray,
+    guess: float,
+    tolerance: float,
+    max_iterations: int,
+) -> dict[str, np.ndarray]:
+    # Solves sum(cash_flows / (1 + rate) ** times) = 0 for every row, where times is shared (1-D) or per row (2-D).
+    n_rows = cash_flows.shape[0]
+    shared_times = times.ndim == 1
+
+    def npv(rate, rows):
+        row_times = times if shared_times else times[rows]
+        discount = (1 + rate[:, None]) ** -row_times
+        weighted = cash_flows[rows] * discount
+        return weighted.sum(axis=1), -(weighted * row_times).sum(axis=1) / (1 + rate)
+
+    rate = np.full(n_rows, np.nan)
+    converged = np.zeros(n_rows, dtype=bool)
+    iterations = np.zeros(n_rows, dtype=np.int64)
+    valid = (cash_flows > 0).any(axis=1) & (cash_flows < 0).any(axis=1)
+    rows = np.flatnonzero(valid)
+
+    with np.errstate(all='ignore'):
+        # Use the sign change or exact root on the grid closest to the guess as each row's bracket, or an unbounded
+        # interval if there is none. Candidates equally close to the guess are resolved towards the one the Newton step
+        # from the guess heads for.
+        grid = np.array(_IRR_BRACKETS)
+        grid_values = np.stack([npv(np.full(rows.size, point), rows)[0] for point in grid], axis=1)
+        finite = np.isfinite(grid_values)
+        sign_change = (grid_values[:, :-1] * grid_values[:, 1:] < 0) & finite[:, :-1] & finite[:, 1:]
+        distance = np.concatenate([
+            np.where(sign_change, np.maximum(np.maximum(grid[:-1] - guess, guess - grid[1:]), 0), np.inf),
+            np.where(grid_values == 0, np.abs(grid - guess), np.inf),
+        ], axis=1)
+        nearest_distance = distance.min(axis=1, initial=np.inf)
+        value, derivative = npv(np.full(rows.size, float(guess)), rows)
+        direction = np.where((derivative != 0) & (value / derivative < 0), 1.0, -1.0)
+        candidate_rate = np.concatenate([grid[:-1], grid])
+        ties = distance <= nearest_distance[:, None] + tolerance
+        nearest = np.where(ties, direction[:, None] * candidate_rate, -np.inf).argmax(axis=1)
+
+        # Rows whose nearest candidate is an exact root on the grid are already solved
+        found = np.isfinite(nearest_distance)
+        solved = found & (nearest >= grid.size - 1)
+        rate[rows[solved]] = grid[nearest[solved] - (grid.size - 1)]
+        converged[rows[solved]] = True
+        bracketed = found[~solved]
+        rows, grid_values, nearest = rows[~solved], grid_values[~solved], np.where(bracketed, nearest[~solved], 0)
+
+        lower = np.where(bracketed, grid[nearest], -1.0)
+        upper = np.where(bracketed, grid[nearest + 1], np.inf)
+        lower_value = grid_values[np.arange(rows.size), nearest]
+        current = np.where((lower < guess) & (guess < upper), guess, (lower + upper) / 2)
+
+        for iteration in range(1, max_iterations + 1):
+            if rows.size == 0:
+                break
+
+            value, derivative = npv(current, rows)
+            move_lower = bracketed & ((value > 0) == (lower_value > 0))
+            lower = np.where(move_lower, current, lower)
+            lower_value = np.where(move_lower, value, lower_value)
+            upper = np.where(bracketed & ~move_lower, current, upper)
+
+            step = current - value / derivative
+            outside = ~((lower < step) & (step < upper))
+            fallback = np.where(bracketed, (lower + upper) / 2, np.where(step <= lower, (current + lower) / 2, np.nan))
+            step = np.where(outside, fallback, step)
+            step = np.where(value == 0, current, step)
+
+            done = np.abs(step - current) < tolerance
+            failed = ~np.isfinite(step) | ~np.isfinite(value)
+            finished = done | failed
+            rate[rows[done]] = step[done]
+            converged[rows[done]] = True
+            iterations[rows] = iteration
+
+            keep = ~finished
+            rows, current, lower, upper, lower_value, bracketed = (
+                rows[keep], step[keep], lower[keep], upper[keep], lower_value[keep], bracketed[keep]
+            )
+
+    return {
+        'rate': rate,
+        'converged': converged,
+        'iterations': iterations,
+    }
+
+
+def discounted_cash_flow(
+    cash_flows: np.ndarray,
+    discount_rate: np.ndarray,
+    compensated: bool = False,
+) -> np.ndarray:
+    '''
+    Returns the discounted cash flows of one or more series of future cash flows at one or more discount rates.
+    The present value polynomial is evaluated with Horner's method, so no per term powers are computed, and a vector
+    of discount rates produces a full present value curve in a single pass over the cash flows.
+
+        Parameters:
+            cash_flows (array_like): Future cash flows ordered chronologically along the last axis
+            discount_rate (array_like or yield_curve): Discount rate, or array of discount rates, of the cash flows,
+                                                       or a yield curve with tenors measured in cash flow periods
+            compensated (bool): Use compensated Horner evaluation, which is as accurate as computing in twice the
+                                working precision, default False
+
+        Returns:
+            discounted_cash_flow (np.ndarray): Adjusted present values of shape cash_flows.shape[:-1] +
+                                               discount_rate.shape
+    '''
+    cash_flows = np.asarray(cash_flows, dtype=np.float64)
+    if isinstance(discount_rate, yield_curve):
+        return cash_flows @ discount_factors(discount_rate, np.arange(1, cash_flows.shape[-1] + 1))
+
+    discount_rate = np.asarray(discount_rate, dtype=np.float64)
+    discount_factor = 1 / (1 + discount_rate)
+    # Put periods first and add trailing singleton axes so each period's cash flows broadcast against every rate
+    periods = np.moveaxis(cash_flows, -1, 0).reshape(
+        cash_flows.shape[-1:] + cash_flows.shape[:-1] + (1,) * discount_rate.ndim
+    )
+    dcf = np.zeros(cash_flows.shape[:-1] + discount_rate.shape)
+
+    if not compensated:
+        for cf in periods[::-1]:
+            dcf = (dcf + cf) * discount_factor
+        return dcf
+
+    # Compensated Horner scheme: carry the exact rounding error of every add and multiply in a correction term
+    error = np.zeros_like(dcf)
+    for cf in periods[::-1]:
+        dcf, add_error = two_sum(dcf, cf)
+        dcf, product_error = two_product(dcf, discount_factor)
+        error = (error + add_error) * discount_factor + product_error
+    return dcf + error
@@ -0,0 +1,116 @@
+'''Combinatorics and binomial probability functions'''
+import math
+import threading
+
+# Factorials up to this value are memoized; larger ones are computed on demand so the table stays bounded
+MAX_CACHED_FACTORIAL = 1024
+
+_factorials = [1]
+_factorials_lock = threading.Lock()
+
+
+def factorial(num: int) -> int:
+    '''
+    Returns the exact factorial of an integer greater than or equal to 0.
+    Results up to MAX_CACHED_FACTORIAL are served from a memoized table, larger ones fall back to math.factorial,
+    which multiplies by binary splitting.
+
+        Parameters:
+            num (int): Input number
+
+        Returns:
+            result (int): The factorial result
+    '''
+    if 0 <= num < len(_factorials):
+        return _factorials[num]
+    if not 0 <= num <= MAX_CACHED_FACTORIAL:
+        return math.factorial(num)  # Raises ValueError for negative numbers
+
+    with _factorials_lock:
+        for i in range(len(_factorials), num + 1):
+            _factorials.append(_factorials[-1] * i)
+    return _factorials[num]
+
+
+def log_factorial(num: float) -> float:
+    '''
+    Returns the natural logarithm of the factorial of a number, without forming the factorial itself.
+
+        Parameters:
+            num (float): Input number, greater than or equal to 0
+
+        Returns:
+            result (float): ln(num!)
+    '''
+    return math.lgamma(num + 1)
+
+
+def log_gamma(num: float) -> float:
+    '''
+    Returns the natural logarithm of the absolute value of the gamma function.
+
+        Parameters:
+            num (float): Input number, not a non-positive integer
+
+        Returns:
+            result (float): ln|gamma(num)|
+    '''
+    return math.lgamma(num)
+
+
+def binomial(n: int, k: int) -> int:
+    '''
+    Returns the exact number of ways to choose k items from n items.
+
+        Parameters:
+            n (int): Number of items, greater than or equal to 0
+            k (int): Number of items chosen
+
+        Returns:
+            result (int): The binomial coefficient, 0 if k is outside 0 to n
+    '''
+    if k < 0 or k > n:
+        return 0
+    return math.comb(n, k)
+
+
+def log_binomial(n: float, k: float) -> float:
+    '''
+    Returns the natural logarithm of the binomial coefficient, for large n where the exact coefficient is huge.
+
+        Parameters:
+            n (float): Number of items, greater than or equal to 0
+            k (float): Number of items chosen, from 0 to n
+
+        Returns:
+            result (float): ln(n choose k)
+    '''
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+def binomial_probabilities(n: int, p: float) -> list[float]:
+    '''
+    Returns the probability of every number of successes in n independent trials, e.g. the probabilities of reaching
+    each node in a row of a binomial tree. Terms are computed in log space, so large n does not underflow or build
+    huge integers.
+
+        Parameters:
+            n (int): Number of trials, greater than or equal to 0
+            p (float): Probability of success in each trial, from 0 to 1
+
+        Returns:
+            probabilities (list[float]): Probability of exactly k successes for k from 0 to n
+    '''
+    if not 0 <= p <= 1:
+        raise ValueError('p must be between 0 and 1')
+    if p == 0 or p == 1:
+        probabilities = [0.0] * (n + 1)
+        probabilities[n if p == 1 else 0] = 1.0
+        return probabilities
+
+    log_p, log_q = math.log(p), math.log1p(-p)
+    log_n_factorial = log_factorial(n)
+    return [
+        math.exp(log_n_factorial - log_factorial(k) - log_factorial(n - k) + k * log_p + (n - k) * log_q)
+        for k in range(n + 1)
+    ]
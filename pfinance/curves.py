@@ -0,0 +1,187 @@
+'''Term structure of interest rates functions'''
+import math
+from bisect import bisect_right
+from typing import Sequence
+
+from pfinance._sequences import as_sequence
+
+_INTERPOLATIONS = ('linear', 'log_linear', 'cubic')
+
+
+class yield_curve:
+    '''
+    Represents a yield curve of annually compounded zero rates at a set of tenors.
+    Discount factors, log discount factors and spline coefficients are precomputed when the curve is built, and
+    lookups locate their tenor interval by binary search. Zero rates are held flat beyond the first and last tenors.
+
+    Methods:
+        from_discount_factors(tenors, discount_factors, interpolation): Builds a curve from discount factors
+        zero_rate(time): Returns the interpolated zero rate at a time
+        discount_factor(time): Returns the interpolated discount factor at a time
+        discount_factors(times): Returns the interpolated discount factors at many times
+    '''
+    def __init__(self, tenors: list[float], zero_rates: list[float], interpolation: str = 'linear'):
+        '''
+        Constructs the necessary attributes for the yield curve object.
+
+        Parameters:
+            tenors (list[float]): Times of the curve points in periods, e.g. years, strictly increasing and positive
+            zero_rates (list[float]): Zero rate per period at each tenor
+            interpolation (str): Interpolation between tenors, one of 'linear' (zero rates), 'log_linear' (discount
+                                 factors) or 'cubic' (natural cubic spline of zero rates), default 'linear'
+        '''
+        if interpolation not in _INTERPOLATIONS:
+            raise ValueError(f'interpolation must be one of {_INTERPOLATIONS}, not {interpolation!r}')
+        tenors = tuple(map(float, as_sequence(tenors)))
+        zero_rates = tuple(map(float, as_sequence(zero_rates)))
+        if len(tenors) != len(zero_rates) or len(tenors) == 0:
+            raise ValueError('tenors and zero_rates must be non-empty and the same length')
+        if tenors[0] <= 0 or any(t1 <= t0 for t0, t1 in zip(tenors, tenors[1:])):
+            raise ValueError('tenors must be positive and strictly increasing')
+
+        self._interpolation = interpolation
+        self._tenors = tenors
+        self._zero_rates = zero_rates
+        self._log_discount = tuple(-tenor * math.log1p(rate) for tenor, rate in zip(tenors, zero_rates))
+        self._curvature = tuple(_natural_spline(tenors, zero_rates)) if interpolation == 'cubic' else None
+
+    @property
+    def interpolation(self) -> str:
+        '''Interpolation between tenors, one of linear, log_linear or cubic'''
+        return self._interpolation
+
+    @property
+    def tenors(self) -> tuple[float, ...]:
+        '''Times of the curve points in periods'''
+        return self._tenors
+
+    @property
+    def zero_rates(self) -> tuple[float, ...]:
+        '''Zero rate per period at each tenor'''
+        return self._zero_rates
+
+    @property
+    def log_discount_factors(self) -> tuple[float, ...]:
+        '''Natural logarithm of the discount factor at each tenor'''
+        return self._log_discount
+
+    @property
+    def curvature(self) -> tuple[float, ...]:
+        '''Second derivatives of the cubic spline of zero rates at each tenor, None for other interpolations'''
+        return self._curvature
+
+    @classmethod
+    def from_discount_factors(
+        cls,
+        tenors: list[float],
+        discount_factors: list[float],
+        interpolation: str = 'log_linear',
+    ) -> 'yield_curve':
+        '''
+        Builds a yield curve from discount factors instead of zero rates.
+
+        Parameters:
+            tenors (list[float]): Times of the curve points in periods, e.g. years, strictly increasing and positive
+            discount_factors (list[float]): Present value of one unit of currency received at each tenor
+            interpolation (str): Interpolation between tenors, default 'log_linear'
+
+        Returns:
+            curve (yield_curve): The equivalent yield curve
+        '''
+        zero_rates = [
+            factor ** (-1 / tenor) - 1 for tenor, factor in zip(as_sequence(tenors), as_sequence(discount_factors))
+        ]
+        return cls(tenors, zero_rates, interpolation)
+
+    def zero_rate(self, time: float) -> float:
+        '''
+        Returns the interpolated zero rate at a time.
+
+        Parameters:
+            time (float): Time in periods, e.g. years
+
+        Returns:
+            zero_rate (float): Zero rate per period
+        '''
+        if time <= 0:
+            return self._zero_rates[0]
+        if self._interpolation == 'log_linear':
+            return self.discount_factor(time) ** (-1 / time) - 1
+
+        i = bisect_right(self._tenors, time)
+        if i == 0:
+            return self._zero_rates[0]
+        if i == len(self._tenors):
+            return self._zero_rates[-1]
+
+        t0, t1 = self._tenors[i - 1], self._tenors[i]
+        z0, z1 = self._zero_rates[i - 1], self._zero_rates[i]
+        weight = (time - t0) / (t1 - t0)
+        if self._interpolation == 'linear':
+            return z0 + weight * (z1 - z0)
+
+        # Natural cubic spline between the two tenors
+        span = t1 - t0
+        a, b = 1 - weight, weight
+        return (
+            a * z0 + b * z1
+            + ((a ** 3 - a) * self._curvature[i - 1] + (b ** 3 - b) * self._curvature[i]) * span ** 2 / 6
+        )
+
+    def discount_factor(self, time: float) -> float:
+        '''
+        Returns the interpolated discount factor at a time.
+
+        Parameters:
+            time (float): Time in periods, e.g. years
+
+        Returns:
+            discount_factor (float): Present value of one unit of currency received at the time
+        '''
+        if time <= 0:
+            return 1.0
+        if self._interpolation != 'log_linear':
+            return (1 + self.zero_rate(time)) ** -time
+
+        i = bisect_right(self._tenors, time)
+        if i == 0:
+            return (1 + self._zero_rates[0]) ** -time
+        if i == len(self._tenors):
+            return (1 + self._zero_rates[-1]) ** -time
+
+        t0, t1 = self._tenors[i - 1], self._tenors[i]
+        l0, l1 = self._log_discount[i - 1], self._log_discount[i]
+        return math.exp(l0 + (time - t0) / (t1 - t0) * (l1 - l0))
+
+    def discount_factors(self, times: list[float]) -> list[float]:
+        '''
+        Returns the interpolated discount factors at many times.
+
+        Parameters:
+            times (list[float]): Times in periods, e.g. years
+
+        Returns:
+            discount_factors (list[float]): Present value of one unit of currency received at each time
+        '''
+        return [self.discount_factor(time) for time in as_sequence(times)]
+
+
+def _natural_spline(x: Sequence[float], y: Sequence[float]) -> list[float]:
+    # Returns the second derivatives of the natural cubic spline through the points, solved with the Thomas algorithm.
+    n = len(x)
+    curvature = [0.0] * n
+    if n < 3:
+        return curvature
+
+    upper, rhs = [0.0] * n, [0.0] * n
+    for i in range(1, n - 1):
+        h0, h1 = x[i] - x[i - 1], x[i + 1] - x[i]
+        diagonal = 2 * (h0 + h1) - h0 * upper[i - 1]
+        upper[i] = h1 / diagonal
+        slope_change = 6 * ((y[i + 1] - y[i]) / h1 - (y[i] - y[i - 1]) / h0)
+        rhs[i] = (slope_change - h0 * rhs[i - 1]) / diagonal
+
+    for i in range(n - 2, 0, -1):
+        curvature[i] = rhs[i] - upper[i] * curvature[i + 1]
+
+    return curvature
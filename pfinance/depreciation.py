@@ -1,4 +1,6 @@
 '''Depreciation of assets functions'''
+from array import array
+from typing import Callable, Iterable, Iterator
 
 
 def straight_line_depreciation(purchase_price: float, salvage_value: float, useful_life: int) -> float:
@@ -30,19 +32,7 @@ def sum_of_years_depreciation(purchase_price: float, salvage_value: float, usefu
                 asset_value (list[float]): Value of the asset at the beginning of the period
                 periodic_depreciation (list[float]): Depreciation of the asset at the end of the period
     '''
-    total_years = useful_life * (useful_life + 1) / 2
-    asset_value = [float(purchase_price)]
-    periodic_depreciation = [0.0]
-
-    for i in range(useful_life, 0, -1):
-        current_depreciation = (purchase_price - salvage_value) * i / total_years
-        periodic_depreciation.append(current_depreciation)
-        asset_value.append(asset_value[-1] - current_depreciation)
-
-    return {
-        'asset_value': asset_value,
-        'periodic_depreciation': periodic_depreciation
-    }
+    return _collect_schedule(iter_sum_of_years_depreciation(purchase_price, salvage_value, useful_life))
 
 
 def double_declining_balance_depreciation(
@@ -65,27 +55,9 @@ def double_declining_balance_depreciation(
                 asset_value (list[float]): Value of the asset at the beginning of the period
                 periodic_depreciation (list[float]): Depreciation of the asset at the end of the period
     '''
-    asset_value = [float(purchase_price)]
-    periodic_depreciation = [0.0]
-    total_depreciation = 0.0
-
-    for _ in range(useful_life):
-        current_depreciation = max(
-            0,
-            min(
-                (purchase_price - total_depreciation) * factor / useful_life,
-                purchase_price - salvage_value - total_depreciation,
-            )
-        )
-
-        periodic_depreciation.append(current_depreciation)
-        total_depreciation += current_depreciation
-        asset_value.append(asset_value[-1] - current_depreciation)
-
-    return {
-        'asset_value': asset_value,
-        'periodic_depreciation': periodic_depreciation,
-    }
+    return _collect_schedule(
+        iter_double_declining_balance_depreciation(purchase_price, salvage_value, useful_life, factor)
+    )
 
 
 def units_of_production_depreciation(
@@ -130,20 +102,159 @@ def declining_balance(
                 asset_value (list[float]): Value of the asset at the beginning of the period
                 periodic_depreciation (list[float]): Depreciation of the asset at the end of the period
     '''
-    rate = round(1 - (salvage_value / purchase_price) ** (1 / useful_life), 3)  # Excel rounds rate to 3 decimal places
-    asset_value = [float(purchase_price)]
-    periodic_depreciation = [0.0]
-    periodic_depreciation.append(purchase_price * rate * sub_periods / 12)  # First depreciation is speical case
+    return _collect_schedule(iter_declining_balance(purchase_price, salvage_value, useful_life, sub_periods))
+
+
+def iter_sum_of_years_depreciation(
+    purchase_price: float,
+    salvage_value: float,
+    useful_life: int,
+) -> Iterator[tuple[int, float, float]]:
+    '''
+    Yields the rows of a sum of years depreciation schedule one period at a time.
+
+        Parameters:
+            purchase_price (float): The total amount paid for the asset
+            salvage_value (float): The value of the asset after its useful life
+            useful_life (int): The expected lifespan of an asset, must be greater than 0
+
+        Yields:
+            row (tuple[int, float, float]): The period, asset value and periodic depreciation
+    '''
+    total_years = useful_life * (useful_life + 1) / 2
+    asset_value = float(purchase_price)
+    yield 0, asset_value, 0.0
+
+    for period, i in enumerate(range(useful_life, 0, -1), 1):
+        current_depreciation = (purchase_price - salvage_value) * i / total_years
+        asset_value -= current_depreciation
+        yield period, asset_value, current_depreciation
+
+
+def iter_double_declining_balance_depreciation(
+    purchase_price: float,
+    salvage_value: float,
+    useful_life: int,
+    factor: float = 2.0,
+) -> Iterator[tuple[int, float, float]]:
+    '''
+    Yields the rows of a double declining balance depreciation schedule one period at a time.
+
+        Parameters:
+            purchase_price (float): The total amount paid for the asset
+            salvage_value (float): The value of the asset after its useful life
+            useful_life (int): The expected lifespan of an asset, must be greater than 0
+            factor (int): The rate at which the balance declines, default 2
 
-    for _ in range(useful_life - 1):
-        asset_value.append(asset_value[-1] - periodic_depreciation[-1])
-        periodic_depreciation.append(asset_value[-1] * rate)
+        Yields:
+            row (tuple[int, float, float]): The period, asset value and periodic depreciation
+    '''
+    asset_value = float(purchase_price)
+    total_depreciation = 0.0
+    yield 0, asset_value, 0.0
 
-    asset_value.append(asset_value[-1] - periodic_depreciation[-1])
+    for period in range(1, useful_life + 1):
+        current_depreciation = max(
+            0,
+            min(
+                (purchase_price - total_depreciation) * factor / useful_life,
+                purchase_price - salvage_value - total_depreciation,
+            )
+        )
+
+        total_depreciation += current_depreciation
+        asset_value -= current_depreciation
+        yield period, asset_value, current_depreciation
+
+
+def iter_declining_balance(
+    purchase_price: float,
+    salvage_value: float,
+    useful_life: int,
+    sub_periods: int = 12,
+) -> Iterator[tuple[int, float, float]]:
+    '''
+    Yields the rows of a declining balance depreciation schedule one period at a time.
+
+        Parameters:
+            purchase_price (float): The total amount paid for the asset
+            salvage_value (float): The value of the asset after its useful life
+            useful_life (int): The expected lifespan of an asset, must be greater than 0
+            sub_periods (int): The number of sub periods inside the first period (e.g. 12 months in one year). Must be less
+                               than or equal to 12, default 12
+
+        Yields:
+            row (tuple[int, float, float]): The period, asset value and periodic depreciation
+    '''
+    rate = round(1 - (salvage_value / purchase_price) ** (1 / useful_life), 3)  # Excel rounds rate to 3 decimal places
+    asset_value = float(purchase_price)
+    yield 0, asset_value, 0.0
+
+    current_depreciation = purchase_price * rate * sub_periods / 12  # First depreciation is special case
+    for period in range(1, useful_life + 1):
+        asset_value -= current_depreciation
+        yield period, asset_value, current_depreciation
+        current_depreciation = asset_value * rate
 
     if sub_periods != 12:  # Last depreciation is special case
-        periodic_depreciation.append(asset_value[-1] * rate * (12 - sub_periods) / 12)
-        asset_value.append(asset_value[-1] - periodic_depreciation[-1])
+        current_depreciation = asset_value * rate * (12 - sub_periods) / 12
+        yield useful_life + 1, asset_value - current_depreciation, current_depreciation
+
+
+def stream_depreciation_schedules(
+    schedule: Callable[..., Iterable[tuple[int, float, float]]],
+    assets: Iterable[tuple],
+    sink: Callable[[dict[str, array]], None],
+    chunk_size: int = 65536,
+) -> int:
+    '''
+    Streams the depreciation schedules of many assets into a columnar sink in fixed size chunks.
+    At most chunk_size rows are held in memory at once, regardless of the number of assets.
+
+        Parameters:
+            schedule (callable): Row generator for the depreciation method, e.g. iter_sum_of_years_depreciation
+            assets (iterable[tuple]): Arguments passed to the row generator for each asset
+            sink (callable): Called with each chunk as a dict of typed arrays, which support the buffer protocol:
+                asset (array[int]): Position of the asset in the assets iterable
+                period (array[int]): Period of the row
+                asset_value (array[float]): Value of the asset at the beginning of the period
+                periodic_depreciation (array[float]): Depreciation of the asset at the end of the period
+            chunk_size (int): Maximum number of rows per chunk, default 65536
+
+        Returns:
+            rows (int): Total number of rows written to the sink
+    '''
+    def new_chunk():
+        return {'asset': array('q'), 'period': array('q'), 'asset_value': array('d'), 'periodic_depreciation': array('d')}
+
+    chunk = new_chunk()
+    rows = 0
+
+    for asset, args in enumerate(assets):
+        for period, asset_value, periodic_depreciation in schedule(*args):
+            chunk['asset'].append(asset)
+            chunk['period'].append(period)
+            chunk['asset_value'].append(asset_value)
+            chunk['periodic_depreciation'].append(periodic_depreciation)
+            rows += 1
+
+            if len(chunk['period']) == chunk_size:
+                sink(chunk)
+                chunk = new_chunk()
+
+    if chunk['period']:
+        sink(chunk)
+
+    return rows
+
+
+def _collect_schedule(rows: Iterable[tuple[int, float, float]]) -> dict[str, list[float]]:
+    # Materializes a row generator into the dict of lists returned by the schedule functions.
+    asset_value, periodic_depreciation = [], []
+
+    for _, value, depreciation in rows:
+        asset_value.append(value)
+        periodic_depreciation.append(depreciation)
 
     return {
         'asset_value': asset_value,
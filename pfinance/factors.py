@@ -0,0 +1,118 @@
+'''Compound and discount factor caching'''
+import threading
+from collections import OrderedDict
+
+
+class factor_cache:
+    '''
+    Represents a bounded, thread safe least recently used cache of compound and discount factor vectors.
+    One vector is kept per rate, holding the factors of every period up to the longest horizon requested so far, and
+    longer horizons extend it instead of adding another entry. The bound counts cached factors rather than vectors, so
+    it limits memory whatever the horizons. A single lookup costs more than a float power in CPython, so the cache pays
+    off where a whole schedule of factors would otherwise be computed, such as time_value.discounted_cash_flow.
+
+    Methods:
+        compound_factors(rate, horizon): Returns the compound factors for periods 0 to horizon
+        discount_factors(rate, horizon): Returns the discount factors for periods 0 to horizon
+        get_stats(): Returns the hit, miss and size counters of the cache
+        clear(): Removes all cached factors and resets the counters
+    '''
+    def __init__(self, max_size: int = 1 << 20):
+        '''
+        Constructs the necessary attributes for the factor cache object.
+
+        Parameters:
+            max_size (int): Maximum number of cached factors summed over all vectors, default 1048576
+        '''
+        self._max_size = max_size
+        self._vectors = OrderedDict()
+        self._size = self._hits = self._misses = 0
+        self._lock = threading.Lock()
+
+    def compound_factors(self, rate: float, horizon: int) -> tuple[float, ...]:
+        '''
+        Returns the precomputed compound factors of a rate for every period up to a horizon.
+
+        Parameters:
+            rate (float): Interest rate per period
+            horizon (int): Last period of the vector
+
+        Returns:
+            compound_factors (tuple[float]): (1 + rate) ** i for i from 0 to horizon
+        '''
+        return self._lookup(False, rate, horizon)
+
+    def discount_factors(self, rate: float, horizon: int) -> tuple[float, ...]:
+        '''
+        Returns the precomputed discount factors of a rate for every period up to a horizon.
+
+        Parameters:
+            rate (float): Discount rate per period
+            horizon (int): Last period of the vector
+
+        Returns:
+            discount_factors (tuple[float]): 1 / (1 + rate) ** i for i from 0 to horizon
+        '''
+        return self._lookup(True, rate, horizon)
+
+    def get_stats(self) -> dict[str, int]:
+        '''
+        Returns the usage counters of the cache.
+
+        Returns:
+            stats (dict):
+                hits (int): Number of lookups answered from the cache
+                misses (int): Number of lookups that computed new factors
+                size (int): Number of factors currently cached
+                max_size (int): Maximum number of cached factors
+        '''
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': self._size,
+                'max_size': self._max_size,
+            }
+
+    def clear(self):
+        '''
+        Removes all cached factors and resets the counters.
+        '''
+        with self._lock:
+            self._vectors.clear()
+            self._size = self._hits = self._misses = 0
+
+    def _lookup(self, discount: bool, rate: float, horizon: int) -> tuple[float, ...]:
+        key = discount, rate
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None and len(vector) > horizon:
+                self._vectors.move_to_end(key)
+                self._hits += 1
+                return vector if len(vector) == horizon + 1 else vector[:horizon + 1]
+            self._misses += 1
+
+        # Extend the cached vector outside the lock, at least doubling it so a slowly growing horizon stays cheap
+        start = 0 if vector is None else len(vector)
+        stop = max(horizon + 1, 2 * start)
+        growth = 1 + rate
+        extension = tuple(1 / growth ** i for i in range(start, stop)) if discount else tuple(
+            growth ** i for i in range(start, stop)
+        )
+        vector = extension if vector is None else vector + extension
+
+        with self._lock:
+            # Another thread may have stored the vector meanwhile, keep whichever is longer
+            cached = self._vectors.pop(key, None)
+            if cached is not None:
+                self._size -= len(cached)
+                if len(cached) > len(vector):
+                    vector = cached
+
+            if len(vector) <= self._max_size:
+                self._vectors[key] = vector
+                self._size += len(vector)
+                while self._size > self._max_size:
+                    self._size -= len(self._vectors.popitem(last=False)[1])
+
+        return vector if len(vector) == horizon + 1 else vector[:horizon + 1]
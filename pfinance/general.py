@@ -1,5 +1,10 @@
 '''Common finance functions'''
 import math
+from operator import mul
+from typing import Sequence
+
+from pfinance import combinatorics
+from pfinance._sequences import as_sequence
 
 
 def simple_interest(principle: float, interest_rate: float, periods: int) -> float:
@@ -18,7 +23,12 @@ def simple_interest(principle: float, interest_rate: float, periods: int) -> flo
     return principle * (1 + interest)
 
 
-def compound_interest(principle: float, interest_rate: float, periods: int, compounding_frequency: int = 1) -> float:
+def compound_interest(
+    principle: float,
+    interest_rate: float,
+    periods: int,
+    compounding_frequency: int = 1,
+) -> float:
     '''
     Returns the total value of an investment earning compound interest.
 
@@ -48,7 +58,13 @@ def effective_interest(nominal_rate: float, periods: int) -> float:
     return (1 + nominal_rate / periods) ** periods - 1
 
 
-def loan_payment(principal: float, interest_rate: float, payment_frequency: int, term: int, down_payment: float = 0) -> float:
+def loan_payment(
+    principal: float,
+    interest_rate: float,
+    payment_frequency: int,
+    term: int,
+    down_payment: float = 0,
+) -> float:
     '''
     Returns the periodic payment required to repay a loan accruing compound interest.
 
@@ -67,7 +83,8 @@ def loan_payment(principal: float, interest_rate: float, payment_frequency: int,
         return loan_amount / term
 
     effective_rate = interest_rate / payment_frequency
-    return loan_amount * effective_rate * (1 + effective_rate) ** term / ((1 + effective_rate) ** term - 1)
+    growth = (1 + effective_rate) ** term
+    return loan_amount * effective_rate * growth / (growth - 1)
 
 
 def equivalent_interest_rate(present_value: float, future_value: float, periods: int) -> float:
@@ -125,6 +142,127 @@ def loan_payment_schedule(
     }
 
 
+class amortization_schedule:
+    '''
+    Represents a loan payment schedule evaluated in closed form.
+    Any period can be queried directly without iterating over the preceding periods. Indexing and iteration follow
+    the lists returned by loan_payment_schedule, and slicing returns a lazy schedule covering a range of periods.
+
+    Methods:
+        get_payment(): Returns the periodic loan payment
+        interest_payment(period): Returns the interest portion of the payment for a period
+        principal_payment(period): Returns the principal portion of the payment for a period
+        remaining_balance(period): Returns the remaining loan balance after a period's payment
+    '''
+    def __init__(
+        self,
+        principal: float,
+        interest_rate: float,
+        payment_frequency: int,
+        term: int,
+        down_payment: float = 0,
+    ):
+        '''
+        Constructs the necessary attributes for the amortization schedule object.
+
+        Parameters:
+            principal (float): Initial value of the loan
+            interest_rate (float): Interest rate per period, e.g. year
+            payment_frequency (int): Number of payments and compoundings per period, e.g. year
+            term (int): Term of the loan in number of payments
+            down_payment (float): Amount paid towards the loan before interest, default 0
+        '''
+        self._set_state(
+            principal - down_payment,
+            interest_rate / payment_frequency,
+            loan_payment(principal, interest_rate, payment_frequency, term, down_payment),
+            range(1, term + 1),
+        )
+
+    @classmethod
+    def _view(cls, schedule: 'amortization_schedule', periods: range) -> 'amortization_schedule':
+        # Returns a schedule over a range of periods that shares the closed form of an existing schedule.
+        view = cls.__new__(cls)
+        view._set_state(schedule._loan_amount, schedule._rate, schedule._payment, periods)
+        return view
+
+    def _set_state(self, loan_amount: float, rate: float, payment: float, periods: range):
+        self._loan_amount = loan_amount
+        self._rate = rate
+        self._payment = payment
+        self._periods = periods
+
+    def __len__(self) -> int:
+        return len(self._periods)
+
+    def __iter__(self):
+        for period in self._periods:
+            yield self._row(period)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._view(self, self._periods[key])
+
+        return self._row(self._periods[key])
+
+    def _row(self, period: int) -> dict[str, float]:
+        interest = self.interest_payment(period)
+        return {
+            'principal_payment': self._payment - interest,
+            'interest_payment': interest,
+            'remaining_balance': self.remaining_balance(period),
+        }
+
+    def get_payment(self) -> float:
+        '''
+        Returns the periodic loan payment.
+
+        Returns:
+            periodic_payment (float): Period loan payment
+        '''
+        return self._payment
+
+    def remaining_balance(self, period: int) -> float:
+        '''
+        Returns the remaining loan balance after the payment for a period.
+
+        Parameters:
+            period (int): Payment number, from 0 (before the first payment) to the term of the loan
+
+        Returns:
+            remaining_balance (float): Remaining loan balance after payment
+        '''
+        if self._rate == 0:
+            return self._loan_amount - self._payment * period
+
+        growth = (1 + self._rate) ** period
+        return self._loan_amount * growth - self._payment * (growth - 1) / self._rate
+
+    def interest_payment(self, period: int) -> float:
+        '''
+        Returns the portion of the loan payment used to pay the interest for a period.
+
+        Parameters:
+            period (int): Payment number, from 1 to the term of the loan
+
+        Returns:
+            interest_payment (float): Interest portion of the payment
+        '''
+        return self.remaining_balance(period - 1) * self._rate
+
+    def principal_payment(self, period: int) -> float:
+        '''
+        Returns the portion of the loan payment used to pay the principal for a period.
+
+        Parameters:
+            period (int): Payment number, from 1 to the term of the loan
+
+        Returns:
+            principal_payment (float): Principal portion of the payment
+        '''
+        return self._payment - self.interest_payment(period)
+
+
 def number_periods_loan(principal: float, interest_rate: float, payment: float) -> float:
     '''
     Returns the number of periods required to payback a loan with fixed payments.
@@ -144,48 +282,41 @@ def number_periods_loan(principal: float, interest_rate: float, payment: float)
     return math.log10(payment / (payment - principal * interest_rate)) / math.log10(1 + interest_rate)
 
 
-def sum_product(*args: list[float]) -> float:
+def sum_product(*args: Sequence[float]) -> float:
     '''
     Returns the sum of lists multiplied by eachother. For example, [3, 5, 6, 1] and [4, 2, 7, 8] returns
     (3 * 4) + (5 * 2) + (6 * 7) + (1 * 8) = 72.
 
         Parameters:
-            *lst_args (list[float]): Any number of lists to be multiplied and summed together
+            *lst_args (Sequence[float]): Any number of lists to be multiplied and summed together
 
         Returns:
             total_sum (float): Total sum of the lists multiplied together. None if lists are different lengths or no
                                lists passed in
     '''
+    args = [as_sequence(lst) for lst in args]
     if len({len(i) for i in args}) != 1:  # Use set comprehension to check if list lengths are same
         return None
 
-    total_sum = 0
-    multiplied = 1
-    len_list = len(args[0])
-
-    for i in range(len_list):
-        for lst in args:
-            multiplied *= lst[i]
-
-        total_sum += multiplied
-        multiplied = 1
+    if len(args) == 2:
+        return sum(map(mul, *args))
 
-    return total_sum
+    return sum(map(math.prod, zip(*args)))
 
 
-def sum_squares(vals: list[float]) -> float:
+def sum_squares(vals: Sequence[float]) -> float:
     '''
     Returns the sum of the square of each value in a list. For example, [5,2,1,3] gives 5^2 + 2^2 + 1^2 + 3^2 = 39.
 
         Parameters:
-            vals (list[float]): List of values
+            vals (Sequence[float]): List of values
 
         Returns:
             total_sum (float): Sum of squares of values in list.
     '''
     total_sum = 0
 
-    for val in vals:
+    for val in as_sequence(vals):
         total_sum += val * val
 
     return total_sum
@@ -199,34 +330,29 @@ def factorial(num: int) -> int:
             num (int): Input number
 
         Returns:
-            result (int): The factorial result
+            result (int): The factorial result, 1 for negative numbers
     '''
-    if num == 0 or num == 1:
+    if num < 0:
         return 1
 
-    result = 1
-
-    for i in range(2, num + 1):
-        result *= i
-
-    return result
+    return combinatorics.factorial(num)
 
 
-def sum_diff_squares(lst1: list[float], lst2: list[float]) -> float:
+def sum_diff_squares(lst1: Sequence[float], lst2: Sequence[float]) -> float:
     '''
     Returns the sum of the difference of squares of the values in two lists with same size. For example, [5,2,3] and
     [3,-1,4] gives (5^2 - 3^2) + (2^2 - (-1)^2) + (3^2 - 4^2) = 12.
 
         Parameters:
-            lst1 (list[float]): List one of values
-            lst2 (list[float]): List two of values
+            lst1 (Sequence[float]): List one of values
+            lst2 (Sequence[float]): List two of values
 
         Returns:
             total_sum (float): Sum of difference of squares of values in lists.
     '''
     total_sum = 0
 
-    for i in range(len(lst1)):
-        total_sum += lst1[i] * lst1[i] - lst2[i] * lst2[i]
+    for val1, val2 in zip(as_sequence(lst1), as_sequence(lst2)):
+        total_sum += val1 * val1 - val2 * val2
 
     return total_sum
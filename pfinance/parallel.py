@@ -0,0 +1,149 @@
+'''Parallel evaluation of pfinance functions over large input tables'''
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Sequence
+
+from pfinance._sequences import as_sequence
+
+
+def parallel_map(
+    function: Callable,
+    *columns: Sequence,
+    workers: int = None,
+    chunk_size: int = None,
+) -> list:
+    '''
+    Returns the results of a function applied to each row of a columnar input table, computed in a process pool.
+    Rows are sent to the workers in chunks. When every result of a chunk is a float, a list of floats or a dict of
+    floats and lists of floats, the worker writes the values into a shared memory block of doubles, so only the block
+    name and the layout are pickled back. Any other results, e.g. ints or None for invalid input, are pickled as they
+    are. Results keep the input order and have the same types as a serial map of the function.
+
+        Parameters:
+            function (callable): Picklable function called as function(*row), e.g. general.loan_payment_schedule or
+                                 a functools.partial of it
+            *columns (Sequence): One column per positional argument of the function, all of the same length
+            workers (int): Number of worker processes, default None for the number of CPUs. A value of 1 evaluates
+                           the rows in the calling process
+            chunk_size (int): Number of rows per task, default None to split the rows into four tasks per worker
+
+        Returns:
+            results (list): Result of the function for each row
+    '''
+    columns = [as_sequence(column) for column in columns]
+    if not columns or len({len(column) for column in columns}) != 1:
+        raise ValueError('at least one column is required and all columns must have the same length')
+
+    rows = len(columns[0])
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or rows == 0:
+        return list(map(function, *columns))
+    if chunk_size is None:
+        chunk_size = -(-rows // (workers * 4))
+
+    chunks = []
+    for start in range(0, rows, chunk_size):
+        chunk = [column[start:start + chunk_size] for column in columns]
+        chunks.append([part.tolist() if isinstance(part, memoryview) else part for part in chunk])
+
+    # Share one resource tracker with the workers so blocks they create are released by the unlink in this process
+    resource_tracker.ensure_running()
+    results, read = [], 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_map_chunk, function, chunk) for chunk in chunks]
+        try:
+            for future in futures:
+                read += 1
+                results.extend(_read_chunk(*future.result()))
+        finally:
+            # Unlink the blocks of chunks that completed but were not read, e.g. because an earlier chunk raised
+            for future in futures[read:]:
+                if not future.cancel() and future.exception() is None and future.result()[0] is not None:
+                    _unlink(future.result()[0])
+    return results
+
+
+def _map_chunk(function: Callable, columns: list[Sequence]) -> tuple:
+    # Evaluates one chunk in a worker and packs the results into a shared memory block of doubles, or returns them to
+    # be pickled when they are not all floats, lists of floats or dicts of both with the same keys.
+    results = list(map(function, *columns))
+    layout = _layout(results)
+    if layout is None:
+        return None, results
+
+    kind, keys, lengths = layout
+    values = array('d')
+    for result in results:
+        for field in result.values() if keys else (result,):
+            if type(field) is float:
+                values.append(field)
+            else:
+                values.extend(field)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(values.itemsize * len(values), 1))
+    memory.buf[:values.itemsize * len(values)] = memoryview(values).cast('B')
+    memory.close()
+    return memory.name, (len(results), len(values), kind, keys, lengths)
+
+
+def _layout(results: list) -> tuple:
+    # Returns the kind of the results, their dict keys and the length of each field, with -1 for a float field, or
+    # None when the results can not be stored as doubles without changing their types.
+    first = results[0]
+    kind = 'dict' if type(first) is dict else 'list' if type(first) is list else 'float'
+    keys = tuple(first) if kind == 'dict' else None
+    lengths = array('q')
+
+    for result in results:
+        if type(result) is not type(first) or (keys and tuple(result) != keys):
+            return None
+        for field in result.values() if keys else (result,):
+            if type(field) is float and kind != 'list':
+                lengths.append(-1)
+            elif type(field) is list and kind != 'float' and all(type(value) is float for value in field):
+                lengths.append(len(field))
+            else:
+                return None
+    return kind, keys, lengths
+
+
+def _read_chunk(name: str, layout) -> list:
+    # Returns the results of a chunk, reading them from the shared memory block written by _map_chunk if there is one.
+    if name is None:
+        return layout
+
+    rows, size, kind, keys, lengths = layout
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        values = array('d')
+        with memory.buf[:size * values.itemsize] as view:
+            values.frombytes(view)
+    finally:
+        memory.close()
+        memory.unlink()
+
+    if kind == 'float':
+        return values.tolist()
+
+    fields, offset = [], 0
+    for length in lengths:
+        if length < 0:
+            fields.append(values[offset])
+            offset += 1
+        else:
+            fields.append(values[offset:offset + length].tolist())
+            offset += length
+
+    if kind == 'list':
+        return fields
+
+    return [dict(zip(keys, fields[row * len(keys):(row + 1) * len(keys)])) for row in range(rows)]
+
+
+def _unlink(name: str):
+    memory = shared_memory.SharedMemory(name=name)
+    memory.close()
+    memory.unlink()
@@ -1,4 +1,11 @@
 '''Securities tracking and analysis functions'''
+import math
+import threading
+from array import array
+from typing import Hashable, Sequence
+
+from pfinance import combinatorics
+from pfinance._sequences import as_sequence
 
 
 def bond_coupon_rate(face_value: float, payment: float, payment_rate: int = 1) -> float:
@@ -83,6 +90,64 @@ def expected_rate_of_return(risk_free_rate: float, beta: float, market_risk_prem
     return risk_free_rate + beta * market_risk_premium
 
 
+def binomial_option_price(
+    spot_price: float,
+    strike_price: float,
+    risk_free_rate: float,
+    volatility: float,
+    expiry: float,
+    steps: int = 500,
+    call: bool = True,
+    american: bool = False,
+    dividend_yield: float = 0,
+) -> float:
+    '''
+    Returns the price of an option using a Cox-Ross-Rubinstein binomial tree.
+    European options are priced in closed form as a binomial sum over the final row of the tree. American options are
+    priced by backward induction over a single row of node values that is overwritten at every step.
+
+        Parameters:
+            spot_price (float): Current price of the underlying security
+            strike_price (float): Price at which the option can be exercised
+            risk_free_rate (float): Continuously compounded risk free rate per year
+            volatility (float): Annualized volatility of the underlying security's returns
+            expiry (float): Time to expiry in years, must be greater than 0
+            steps (int): Number of time steps in the tree, default 500
+            call (bool): Price a call option, otherwise a put option, default True
+            american (bool): Allow exercise before expiry, default False
+            dividend_yield (float): Continuously compounded dividend yield per year, default 0
+
+        Returns:
+            option_price (float): Present value of the option
+    '''
+    dt = expiry / steps
+    up = math.exp(volatility * math.sqrt(dt))
+    down = 1 / up
+    discount = math.exp(-risk_free_rate * dt)
+    p = (math.exp((risk_free_rate - dividend_yield) * dt) - down) / (up - down)
+    sign = 1 if call else -1
+
+    if not american:
+        probabilities = combinatorics.binomial_probabilities(steps, p)
+        expected_payoff = sum(
+            probability * max(sign * (spot_price * up ** (2 * k - steps) - strike_price), 0)
+            for k, probability in enumerate(probabilities)
+        )
+        return expected_payoff * discount ** steps
+
+    values = [max(sign * (spot_price * up ** (2 * k - steps) - strike_price), 0) for k in range(steps + 1)]
+    up_weight, down_weight = discount * p, discount * (1 - p)
+
+    for step in range(steps - 1, -1, -1):
+        # Node k of this step sits at spot * up ** (2k - step); walk it up by up ** 2 instead of raising a power per node
+        node_price = spot_price * up ** -step
+        for k in range(step + 1):
+            values[k] = max(up_weight * values[k + 1] + down_weight * values[k], sign * (node_price - strike_price))
+            node_price *= up * up
+
+    return values[0]
+
+
 class adjusted_cost_base:
     '''
     Represents an adjusted cost base tracker
@@ -142,3 +207,265 @@ class adjusted_cost_base:
             acb (float): Adjusted cost base of the position
         '''
         return self._acb
+
+
+class _position:
+    '''
+    Holds the state of a single adjusted cost base position.
+    '''
+    __slots__ = ('shares', 'book_value', 'acb')
+
+    def __init__(self, shares: float = 0, book_value: float = 0, acb: float = 0):
+        self.shares = shares
+        self.book_value = book_value
+        self.acb = acb
+
+
+class acb_ledger:
+    '''
+    Represents an adjusted cost base ledger for many securities fed with columnar batches of trades.
+    Each position follows the same rules as adjusted_cost_base. Trades in a batch are grouped by security and each
+    security's trades are replayed in their original order, so the result matches processing trades one at a time.
+
+    Methods:
+        ingest(security_ids, sides, quantities, unit_prices, commissions): Records a batch of trades
+        get_acb(security_id): Returns the adjusted cost base of a position
+        get_shares(security_id): Returns the number of securities held in a position
+        get_trade_count(): Returns the number of trades recorded
+        snapshot(): Returns a checkpoint of the ledger
+        from_snapshot(snapshot): Builds a ledger from a checkpoint
+    '''
+    def __init__(self):
+        '''
+        Constructs the necessary attributes for the adjusted cost base ledger object.
+        '''
+        self._positions = {}
+        self._trade_count = 0
+
+    def ingest(
+        self,
+        security_ids: Sequence[Hashable],
+        sides: Sequence[str],
+        quantities: Sequence[float],
+        unit_prices: Sequence[float],
+        commissions: Sequence[float] = None,
+    ) -> array:
+        '''
+        Records a batch of trades given as equal length columns.
+
+        Parameters:
+            security_ids (Sequence[Hashable]): Identifier of the security traded
+            sides (Sequence[str]): Side of each trade, 'buy' or 'sell'
+            quantities (Sequence[float]): Number of securities transacted
+            unit_prices (Sequence[float]): Price per security
+            commissions (Sequence[float]): Commission paid in each trade, default None for no commissions
+
+        Returns:
+            capital_gains (array[float]): Capital gain realized by each trade, 0 for purchases
+        '''
+        security_ids, sides = as_sequence(security_ids), as_sequence(sides)
+        quantities, unit_prices = as_sequence(quantities), as_sequence(unit_prices)
+        if commissions is not None:
+            commissions = as_sequence(commissions)
+
+        capital_gains = array('d', bytes(8 * len(security_ids)))
+        trades_by_security = {}
+        for i, (security_id, side) in enumerate(zip(security_ids, sides)):
+            if side != 'buy' and side != 'sell':
+                raise ValueError(f"side must be 'buy' or 'sell', not {side!r}")
+            trades_by_security.setdefault(security_id, []).append(i)
+
+        for security_id, trades in trades_by_security.items():
+            position = self._positions.get(security_id)
+            if position is None:
+                position = self._positions[security_id] = _position()
+
+            # Replay with local variables to avoid attribute access on every trade
+            shares, book_value, acb = position.shares, position.book_value, position.acb
+            for i in trades:
+                quantity, unit_price = quantities[i], unit_prices[i]
+                commission = commissions[i] if commissions is not None else 0
+                if sides[i] == 'buy':
+                    shares += quantity
+                    book_value += quantity * unit_price + commission
+                    acb = book_value / shares
+                else:
+                    shares -= quantity
+                    capital_gains[i] = (quantity * unit_price - commission) - (quantity * acb)
+                    if shares == 0:
+                        book_value = 0
+                        acb = 0
+                    else:
+                        book_value -= quantity * acb
+            position.shares, position.book_value, position.acb = shares, book_value, acb
+
+        self._trade_count += len(security_ids)
+        return capital_gains
+
+    def get_acb(self, security_id: Hashable) -> float:
+        '''
+        Returns the adjusted cost base of a position.
+
+        Parameters:
+            security_id (Hashable): Identifier of the security
+
+        Returns:
+            acb (float): Adjusted cost base of the position, 0 if the security was never traded
+        '''
+        position = self._positions.get(security_id)
+        return position.acb if position is not None else 0
+
+    def get_shares(self, security_id: Hashable) -> float:
+        '''
+        Returns the number of securities held in a position.
+
+        Parameters:
+            security_id (Hashable): Identifier of the security
+
+        Returns:
+            shares (float): Number of securities held, 0 if the security was never traded
+        '''
+        position = self._positions.get(security_id)
+        return position.shares if position is not None else 0
+
+    def get_trade_count(self) -> int:
+        '''
+        Returns the number of trades recorded by the ledger.
+
+        Returns:
+            trade_count (int): Number of trades recorded, i.e. where to resume a replay from a snapshot
+        '''
+        return self._trade_count
+
+    def snapshot(self) -> dict:
+        '''
+        Returns a checkpoint of the ledger that replays can resume from.
+
+        Returns:
+            snapshot (dict):
+                trade_count (int): Number of trades recorded when the snapshot was taken
+                positions (dict): Mapping of security identifier to (shares, book_value, acb)
+        '''
+        return {
+            'trade_count': self._trade_count,
+            'positions': {
+                security_id: (position.shares, position.book_value, position.acb)
+                for security_id, position in self._positions.items()
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> 'acb_ledger':
+        '''
+        Builds a ledger from a checkpoint returned by snapshot.
+
+        Parameters:
+            snapshot (dict): Checkpoint of a ledger
+
+        Returns:
+            ledger (acb_ledger): Ledger in the state captured by the snapshot
+        '''
+        ledger = cls()
+        ledger._trade_count = snapshot['trade_count']
+        ledger._positions = {security_id: _position(*state) for security_id, state in snapshot['positions'].items()}
+        return ledger
+
+
+class acb_portfolio:
+    '''
+    Represents a thread safe collection of adjusted cost base positions keyed by account and security.
+    Positions are guarded by a fixed set of striped locks, so trades on positions in different stripes proceed in
+    parallel while trades on the same position are serialized.
+
+    Methods:
+        buy(account, security, quantity, unit_price, commission): Records a purchase transaction
+        sell(account, security, quantity, unit_price, commission): Records a sale transaction
+        get_acb(account, security): Returns the adjusted cost base of a position
+        snapshot(): Returns a consistent point in time copy of every position
+    '''
+    def __init__(self, stripes: int = 64):
+        '''
+        Constructs the necessary attributes for the adjusted cost base portfolio object.
+
+        Parameters:
+            stripes (int): Number of locks shared between the positions, default 64
+        '''
+        self._positions = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def _lock(self, key: tuple) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def buy(self, account: Hashable, security: Hashable, quantity: int, unit_price: float, commission: float = 0):
+        '''
+        Records a purchase transaction.
+
+        Parameters:
+            account (Hashable): Identifier of the account
+            security (Hashable): Identifier of the security
+            quantity (int): Number of securities purchased
+            unit_price (float): Price per security paid
+            commission (float): Commission paid in the transaction, default 0
+        '''
+        key = (account, security)
+        with self._lock(key):
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = adjusted_cost_base()
+            position.buy(quantity, unit_price, commission)
+
+    def sell(self, account: Hashable, security: Hashable, quantity: int, unit_price: float, commission: float = 0) -> float:
+        '''
+        Records a sale transaction.
+
+        Parameters:
+            account (Hashable): Identifier of the account
+            security (Hashable): Identifier of the security
+            quantity (int): Number of securities sold
+            unit_price (float): Price per security received
+            commission (float): Commission paid in the transaction, default 0
+
+        Returns:
+            capital_gain (float): The capital gain on the sale
+        '''
+        key = (account, security)
+        with self._lock(key):
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = adjusted_cost_base()
+            return position.sell(quantity, unit_price, commission)
+
+    def get_acb(self, account: Hashable, security: Hashable) -> float:
+        '''
+        Returns the adjusted cost base of a position.
+
+        Parameters:
+            account (Hashable): Identifier of the account
+            security (Hashable): Identifier of the security
+
+        Returns:
+            acb (float): Adjusted cost base of the position, 0 if the security was never traded in the account
+        '''
+        key = (account, security)
+        with self._lock(key):
+            position = self._positions.get(key)
+            return position.get_acb() if position is not None else 0
+
+    def snapshot(self) -> dict[tuple, tuple[float, float, float]]:
+        '''
+        Returns a consistent point in time copy of every position.
+        All stripes are locked, in a fixed order, while the copy is taken.
+
+        Returns:
+            positions (dict): Mapping of (account, security) to (shares, book_value, acb)
+        '''
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            return {
+                key: (position._shares, position._book_value, position._acb)
+                for key, position in self._positions.items()
+            }
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
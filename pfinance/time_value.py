@@ -1,4 +1,15 @@
 '''Time value of money functions'''
+import datetime
+from itertools import islice
+from operator import mul
+from typing import Callable, Sequence
+
+from pfinance._sequences import as_sequence
+from pfinance.curves import yield_curve
+from pfinance.factors import factor_cache
+
+# Rates probed for a sign change of the net present value before solving for an internal rate of return
+_IRR_BRACKETS = (-0.9, -0.75, -0.5, -0.25, 0.0, 0.05, 0.1, 0.2, 0.35, 0.5, 1.0, 2.0, 5.0)
 
 
 def future_value_series(
@@ -29,7 +40,7 @@ def future_value_series(
     start_modifier = 1
     if start_of_period:
         start_modifier = 1 + effective_rate
-    return payment * start_modifier * (((1 + effective_rate) ** total_periods) - 1) / effective_rate
+    return payment * start_modifier * ((1 + effective_rate) ** total_periods - 1) / effective_rate
 
 
 def present_value(
@@ -44,7 +55,8 @@ def present_value(
 
         Parameters:
             payment (float): The regular payment made each period
-            interest_rate (float): The interest rate per period, e.g. year
+            interest_rate (float or yield_curve): The interest rate per period, e.g. year, or a yield curve with
+                                                  tenors measured in payment periods
             periods (int): Number of payments made over the term of the investment
             future_value (float): The total cash amount you want to have at the last payment, default 0
             start_of_period (bool): Payment is made at start of each period, default False
@@ -52,6 +64,12 @@ def present_value(
         Returns:
             present_value (float): Present value of a loan or investment
     '''
+    if isinstance(interest_rate, yield_curve):
+        first_payment = 0 if start_of_period else 1
+        payment_times = range(first_payment, first_payment + periods)
+        discounted_payments = sum(interest_rate.discount_factors(payment_times))
+        return -1 * (payment * discounted_payments + future_value * interest_rate.discount_factor(periods))
+
     if interest_rate == 0:
         return (-1 * payment * periods) - future_value
 
@@ -60,36 +78,51 @@ def present_value(
     else:
         pv_type = 0
 
-    numerator = payment * (1 + interest_rate * pv_type) * ((1 + interest_rate) ** periods - 1) / interest_rate + future_value
     denominator = (1 + interest_rate) ** periods
+    numerator = payment * (1 + interest_rate * pv_type) * (denominator - 1) / interest_rate + future_value
 
     return -1 * numerator / denominator
 
 
-def discounted_cash_flow(cash_flows: list[float], discount_rate: float) -> float:
+def discounted_cash_flow(
+    cash_flows: Sequence[float],
+    discount_rate: float,
+    cache: factor_cache = None,
+) -> float:
     '''
     Returns the discounted cash flow of a series of future cash flows.
 
         Parameters:
-            cash_flows (list[float]): Future cash flows ordered chronologically
-            discount_rate (float): Discount rate of the cash flows
+            cash_flows (Sequence[float]): Future cash flows ordered chronologically
+            discount_rate (float or yield_curve): Discount rate of the cash flows, or a yield curve with tenors
+                                                  measured in cash flow periods
+            cache (factor_cache): Cache of precomputed discount factor vectors to use instead of discounting each cash
+                                  flow, default None
 
         Returns:
             discounted_cash_flow (float): Adjusted present value of the future cash flows
     '''
+    cash_flows = as_sequence(cash_flows)
+    if isinstance(discount_rate, yield_curve):
+        return sum(map(mul, cash_flows, discount_rate.discount_factors(range(1, len(cash_flows) + 1))))
+
+    if cache is not None:
+        discount_factors = cache.discount_factors(discount_rate, len(cash_flows))
+        return sum(map(mul, cash_flows, islice(discount_factors, 1, None)))
+
     dcf = 0
     for i, cf in enumerate(cash_flows):
         dcf += cf / (1 + discount_rate) ** (i + 1)
     return dcf
 
 
-def modified_internal_rate_of_return(cash_flows: list[float], finance_rate: float, reinvest_rate: float) -> float:
+def modified_internal_rate_of_return(cash_flows: Sequence[float], finance_rate: float, reinvest_rate: float) -> float:
     '''
     Returns the modified internal rate of return for a list of periodic cash flows.
     Considers both the cost of investment and the interest received on reinvested cash.
 
         Parameters:
-            cash_flows (list[float]): List of cash flows ordered chronologically. Must contain at least one positive
+            cash_flows (Sequence[float]): List of cash flows ordered chronologically. Must contain at least one positive
                                       and one negative value
             finance_rate (float): The interest rate you pay for money that is borrowed
             reinvest_rate (float): The interest rate you receive for money that is invested
@@ -97,42 +130,184 @@ def modified_internal_rate_of_return(cash_flows: list[float], finance_rate: floa
         Returns:
             modified_internal_rate_of_return (float): Decimal value of the MIRR, None for invalid cash flows
     '''
-    negative_values = []
-    positive_values = []
-
-    for value in cash_flows:
-        if value < 0:
-            negative_values.append(value)
-            positive_values.append(0.0)
-        elif value > 0:
-            positive_values.append(value)
-            negative_values.append(0.0)
-        else:
-            negative_values.append(0.0)
-            positive_values.append(0.0)
-
-    if (len(set(negative_values)) <= 1 or len(set(positive_values)) <= 1):
+    # Discount the positive and negative cash flows in one backwards pass without splitting them into new lists
+    reinvest_factor = 1 / (1 + reinvest_rate)
+    finance_factor = 1 / (1 + finance_rate)
+    positive_dcf, negative_dcf = 0, 0
+    n = 0
+
+    for value in reversed(as_sequence(cash_flows)):
+        positive_dcf = (positive_dcf + max(value, 0)) * reinvest_factor
+        negative_dcf = (negative_dcf + min(value, 0)) * finance_factor
+        n += 1
+
+    if positive_dcf == 0 or negative_dcf == 0:
         return None
 
-    n = len(cash_flows)
-    numerator = -1 * discounted_cash_flow(positive_values, reinvest_rate) * (1 + reinvest_rate) ** n
-    denominator = discounted_cash_flow(negative_values, finance_rate) * (1 + finance_rate)
+    numerator = -1 * positive_dcf * (1 + reinvest_rate) ** n
+    denominator = negative_dcf * (1 + finance_rate)
 
     return (numerator / denominator) ** (1 / (n - 1)) - 1
 
 
-def future_value_schedule(principal: float, interest_schedule: list[float]) -> float:
+def future_value_schedule(principal: float, interest_schedule: Sequence[float]) -> float:
     '''
     Returns the future value of an investment based on a schedule of interest rates.
 
         Parameters:
             principal (float): The intiial investment sum
-            interest_schedule (list[float]): Schedule of interest rates per period
+            interest_schedule (Sequence[float]): Schedule of interest rates per period
 
         Returns:
             future_value (float): The future value of the investment
     '''
-    for interest in interest_schedule:
+    for interest in as_sequence(interest_schedule):
         principal *= 1 + interest
 
     return principal
+
+
+def internal_rate_of_return(
+    cash_flows: Sequence[float],
+    guess: float = 0.1,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> float:
+    '''
+    Returns the internal rate of return for a list of periodic cash flows.
+    The rate is solved with Newton's method, falling back to bisection whenever a step leaves the bracketing interval.
+
+        Parameters:
+            cash_flows (Sequence[float]): List of cash flows ordered chronologically. Must contain at least one positive
+                                      and one negative value
+            guess (float): Starting estimate of the rate, default 0.1
+            tolerance (float): Change in rate between iterations at which the solution is accepted, default 1e-10
+            max_iterations (int): Maximum number of iterations, default 100
+
+        Returns:
+            internal_rate_of_return (float): Decimal value of the IRR, None for invalid cash flows or no convergence
+    '''
+    cash_flows = as_sequence(cash_flows)
+
+    def npv(rate: float) -> tuple[float, float]:
+        # The first cash flow is discounted by one period, which scales the NPV without moving its root
+        derivative = 0.0
+        for i, cf in enumerate(cash_flows):
+            derivative -= (i + 1) * cf / (1 + rate) ** (i + 2)
+        return discounted_cash_flow(cash_flows, rate), derivative
+
+    if not any(cf > 0 for cf in cash_flows) or not any(cf < 0 for cf in cash_flows):
+        return None
+
+    return _solve_rate(npv, guess, tolerance, max_iterations)
+
+
+def xirr(
+    cash_flows: Sequence[float],
+    dates: list[datetime.date],
+    guess: float = 0.1,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> float:
+    '''
+    Returns the annual internal rate of return for a schedule of dated cash flows.
+    Cash flows are discounted to the first date over a 365 day year.
+
+        Parameters:
+            cash_flows (Sequence[float]): List of cash flows. Must contain at least one positive and one negative value
+            dates (list[datetime.date]): Date of each cash flow, the first date is the start of the investment. Must be
+                                         the same length as cash_flows
+            guess (float): Starting estimate of the rate, default 0.1
+            tolerance (float): Change in rate between iterations at which the solution is accepted, default 1e-10
+            max_iterations (int): Maximum number of iterations, default 100
+
+        Returns:
+            xirr (float): Decimal value of the annual IRR, None for invalid cash flows or no convergence
+    '''
+    cash_flows, dates = as_sequence(cash_flows), as_sequence(dates)
+    if len(cash_flows) != len(dates):
+        raise ValueError('cash_flows and dates must be the same length')
+    if not any(cf > 0 for cf in cash_flows) or not any(cf < 0 for cf in cash_flows):
+        return None
+    years = [(date - dates[0]).days / 365 for date in dates]
+
+    def npv(rate: float) -> tuple[float, float]:
+        value, derivative = 0.0, 0.0
+        for cf, t in zip(cash_flows, years):
+            value += cf / (1 + rate) ** t
+            derivative -= t * cf / (1 + rate) ** (t + 1)
+        return value, derivative
+
+    return _solve_rate(npv, guess, tolerance, max_iterations)
+
+
+def _solve_rate(
+    npv: Callable[[float], tuple[float, float]],
+    guess: float,
+    tolerance: float,
+    max_iterations: int,
+) -> float:
+    # Finds a root of npv, which returns the net present value and its derivative at a rate.
+    values = []
+    for rate in _IRR_BRACKETS:
+        try:
+            values.append((rate, npv(rate)[0]))
+        except (OverflowError, ZeroDivisionError):
+            pass
+
+    # Use the sign change or exact root on the grid closest to the guess as the bracket, or an unbounded interval if
+    # there is none. Candidates equally close to the guess are resolved towards the one the Newton step from the guess
+    # heads for.
+    lower, upper, lower_value = -1.0, float('inf'), None
+    brackets = [(a, b) for a, b in zip(values, values[1:]) if a[1] * b[1] < 0]
+    brackets += [(point, point) for point in values if point[1] == 0]
+    if brackets:
+        distances = [max(a[0] - guess, guess - b[0], 0) for a, b in brackets]
+        nearest = [bracket for bracket, distance in zip(brackets, distances) if distance <= min(distances) + tolerance]
+        bracket = nearest[0]
+        if len(nearest) > 1:
+            direction = _newton_direction(npv, guess)
+            bracket = max(nearest, key=lambda candidate: direction * candidate[0][0])
+        (lower, lower_value), (upper, _) = bracket
+        if lower_value == 0:
+            return lower
+
+    rate = guess if lower < guess < upper else (lower + upper) / 2
+    for _ in range(max_iterations):
+        try:
+            value, derivative = npv(rate)
+        except (OverflowError, ZeroDivisionError):
+            return None
+
+        if value == 0:
+            return rate
+
+        if lower_value is not None:
+            if (value > 0) == (lower_value > 0):
+                lower, lower_value = rate, value
+            else:
+                upper = rate
+
+        next_rate = rate - value / derivative if derivative else float('nan')
+        if not lower < next_rate < upper:
+            if lower_value is not None:
+                next_rate = (lower + upper) / 2
+            elif next_rate <= lower:
+                next_rate = (rate + lower) / 2  # Step halfway towards the -100% boundary instead of past it
+            else:
+                return None
+
+        if abs(next_rate - rate) < tolerance:
+            return next_rate
+        rate = next_rate
+
+    return None
+
+
+def _newton_direction(npv: Callable[[float], tuple[float, float]], rate: float) -> float:
+    # Returns 1 if the Newton step from the rate increases it and -1 otherwise.
+    try:
+        value, derivative = npv(rate)
+    except (OverflowError, ZeroDivisionError):
+        return -1.0
+    return 1.0 if derivative and value / derivative < 0 else -1.0
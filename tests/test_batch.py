@@ -0,0 +1,479 @@
+import io
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal
+from fractions import Fraction
+
+import pytest
+
+from pfinance import conversion, curves, depreciation, general, securities, time_value
+
+np = pytest.importorskip('numpy')
+batch_bonds = pytest.importorskip('pfinance.batch.bonds')
+batch_conversion = pytest.importorskip('pfinance.batch.conversion')
+batch_curves = pytest.importorskip('pfinance.batch.curves')
+batch_depreciation = pytest.importorskip('pfinance.batch.depreciation')
+batch_fixed_point = pytest.importorskip('pfinance.batch.fixed_point')
+batch_general = pytest.importorskip('pfinance.batch.general')
+batch_risk = pytest.importorskip('pfinance.batch.risk')
+batch_securities = pytest.importorskip('pfinance.batch.securities')
+batch_simulation = pytest.importorskip('pfinance.batch.simulation')
+batch_time_value = pytest.importorskip('pfinance.batch.time_value')
+
+
+# General
+def test_loan_payment():
+    principal = np.array([1000, 100000, 150000, 500])
+    interest_rate = np.array([0, 0.10, 0.10, 0.06])
+    payment_frequency = np.array([1, 12, 12, 12])
+    term = np.array([10, 60, 60, 7])
+    down_payment = np.array([0, 0, 50000, 0])
+    expected = [
+        general.loan_payment(*args)
+        for args in zip(principal, interest_rate, payment_frequency, term, down_payment)
+    ]
+    result = batch_general.loan_payment(principal, interest_rate, payment_frequency, term, down_payment)
+    assert np.allclose(result, expected)
+    assert np.allclose(batch_general.loan_payment(1000, [0, 0.12], 12, 6), [1000 / 6, 172.5484])
+
+
+def test_sum_product():
+    assert batch_general.sum_product() is None
+    assert batch_general.sum_product([1, 2, 3, 4], [1, 2, 3, 4, 5]) is None
+    assert batch_general.sum_product([1, 2, 3, 4, 5], [1, 2, 3, 4, 5]) == 55
+    result = batch_general.sum_product([1.2, 2, 2.6, 4], [5.2, 1.7, 8.6, 9.4], [5.5, 2.6, 4.8, 7.5])
+    assert round(float(result), 2) == 432.49
+    assert np.allclose(batch_general.sum_product([[1, 2], [3, 4]], [[1, 1], [2, 2]]), [3, 14])
+    buffer = memoryview(array('d', [3, 5, 6, 1]))
+    assert batch_general.sum_product(buffer, array('d', [4, 2, 7, 8])) == 72
+
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=1001) * 10.0 ** rng.integers(-8, 8, size=1001)
+    b = rng.normal(size=1001)
+    exact = sum(Fraction(x) * Fraction(y) for x, y in zip(a, b))
+    assert batch_general.sum_product(a, b, compensated=True) == float(exact)
+    assert batch_general.sum_product(a, compensated=True) == float(sum(Fraction(x) for x in a))
+
+
+def test_sum_squares():
+    assert batch_general.sum_squares([0]) == 0
+    assert batch_general.sum_squares([-5, 2, -1, 3]) == 39
+    assert round(float(batch_general.sum_squares([1.1, 2.2, 3.3], compensated=True)), 2) == 16.94
+
+
+def test_sum_diff_squares():
+    assert batch_general.sum_diff_squares([], []) == 0
+    assert batch_general.sum_diff_squares([5, 2, 3], [3, -1, 4]) == 12
+    assert batch_general.sum_diff_squares([5, 2, 3], [2, 1, 0], compensated=True) == 33
+    result = batch_general.sum_diff_squares([[5, 2, 3], [1.1, 2.2, 3.3]], [[2, 1, 0], [4.4, 5.5, 6.6]])
+    assert np.allclose(result, [33, -76.23])
+
+
+def test_weighted_sum():
+    positions = np.array([[1, 2, 3], [4, 5, 6]])
+    assert np.allclose(batch_general.weighted_sum(positions, [0.5, 1, 2]), [8.5, 19])
+    assert np.allclose(batch_general.weighted_sum(positions, [0.5, 1, 2], compensated=True), [8.5, 19])
+
+
+# Time Value
+def test_present_value():
+    payment = np.array([100, 500, 200, 200])
+    interest_rate = np.array([0, 0.06, 0.07, 0])
+    periods = np.array([12, 48, 36, 36])
+    future_value = np.array([0, 9000, 1000, 1000])
+    start_of_period = np.array([False, False, True, True])
+    expected = [
+        time_value.present_value(*args)
+        for args in zip(payment, interest_rate, periods, future_value, start_of_period)
+    ]
+    result = batch_time_value.present_value(payment, interest_rate, periods, future_value, start_of_period)
+    assert np.allclose(result, expected)
+    assert round(float(batch_time_value.present_value(500, 0.06, 48, 9000)), 2) == -8374.00
+
+
+def test_loan_payment_schedule():
+    principal = [1000, 526, 500]
+    interest_rate = [0.12, 0.06, 0]
+    payment_frequency = 12
+    term = [6, 7, 5]
+    result = batch_general.loan_payment_schedule(principal, interest_rate, payment_frequency, term)
+    assert result['principal_payment'].shape == (3, 7)
+    for row, args in enumerate(zip(principal, interest_rate, term)):
+        expected = general.loan_payment_schedule(args[0], args[1], payment_frequency, args[2])
+        for key in ('principal_payment', 'interest_payment', 'remaining_balance'):
+            assert np.allclose(result[key][row, :args[2]], expected[key])
+            assert not result[key][row, args[2]:].any()
+
+
+# Conversion
+def test_dollar_decimal():
+    values, fractions = [1.2, 9000.4123, 703.238, -1.2], [16, 200, 23, 16]
+    expected = [conversion.dollar_decimal(value, fraction) for value, fraction in zip(values, fractions)]
+    assert np.allclose(batch_conversion.dollar_decimal(values, fractions), expected)
+    expected = [conversion.dollar_decimal(value, 100) for value in values]
+    assert np.allclose(batch_conversion.dollar_decimal(values, 100), expected)
+
+
+def test_dollar_fractional():
+    values, fractions = [1.125, 1.125, 738.526], [16, 32, 29]
+    expected = [conversion.dollar_fractional(value, fraction) for value, fraction in zip(values, fractions)]
+    result = batch_conversion.dollar_fractional(values, fractions)
+    assert np.allclose(result, expected)
+    assert np.allclose(batch_conversion.dollar_decimal(result, fractions), values)
+
+
+def test_parse_fractional_quotes(tmp_path):
+    text = b'99-16+ 99-16\n100-00,101-312  98-164;100\n 99-31+'
+    expected = [99 + 16.5 / 32, 99.5, 100, 101 + 31.25 / 32, 98 + 16.5 / 32, 100, 99 + 31.5 / 32]
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(text), expected)
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(io.BytesIO(text), chunk_size=5), expected)
+
+    path = tmp_path / 'quotes.txt'
+    path.write_bytes(text)
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(path, chunk_size=7), expected)
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(b'99-63+ 1-01', 64), [99 + 63.5 / 64, 1 + 1 / 64])
+    assert batch_conversion.parse_fractional_quotes(b' \n').size == 0
+
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(io.StringIO('99-16+ 100'), chunk_size=4), expected[::5])
+    assert batch_conversion.parse_fractional_quotes(io.BytesIO(b'99-16'), chunk_size=1) == [99.5]  # No separators
+
+    assert np.array_equal(batch_conversion.parse_fractional_quotes(b'99-31+ 99-317'), [99 + 31.5 / 32, 99 + 31.875 / 32])
+
+    malformed = (b'99-1x', b'99-1', b'99--16', b'9+9-16', b'99-1234', b'-16', b'1' * 16 + b'-16')
+    for invalid in malformed + (b'99-32', b'99-45', b'99-168', b'99-169'):
+        with pytest.raises(ValueError):
+            batch_conversion.parse_fractional_quotes(invalid)
+    with pytest.raises(ValueError, match='byte 10'):
+        batch_conversion.parse_fractional_quotes(io.BytesIO(b'99-16 99-1x'), chunk_size=6)
+
+
+# Depreciation
+def _assert_padded_schedule(result, expected, row):
+    length = len(expected['asset_value'])
+    assert np.allclose(result['asset_value'][row, :length], expected['asset_value'])
+    assert np.allclose(result['periodic_depreciation'][row, :length], expected['periodic_depreciation'])
+    assert np.allclose(result['asset_value'][row, length:], expected['asset_value'][-1])
+    assert not result['periodic_depreciation'][row, length:].any()
+
+
+def test_straight_line_depreciation():
+    assert np.allclose(batch_depreciation.straight_line_depreciation([2000, 30000], [500, 7500], [5, 10]), [300, 2250])
+
+
+def test_sum_of_years_depreciation():
+    assets = [(1000, 20, 5), (12345, 321, 7), (100, 0, 1)]
+    result = batch_depreciation.sum_of_years_depreciation(*zip(*assets))
+    assert result['asset_value'].shape == (3, 8)
+    for row, args in enumerate(assets):
+        _assert_padded_schedule(result, depreciation.sum_of_years_depreciation(*args), row)
+
+
+def test_double_declining_balance_depreciation():
+    assets = [(10000, 2000, 5, 2), (20000, 1000, 6, 3), (100, 200, 2, 2), (100, 0, 1, 2)]
+    result = batch_depreciation.double_declining_balance_depreciation(*zip(*assets))
+    for row, args in enumerate(assets):
+        _assert_padded_schedule(result, depreciation.double_declining_balance_depreciation(*args), row)
+
+
+def test_declining_balance():
+    assets = [(1000, 100, 6, 12), (500, 20, 6, 3), (900, 29, 5, 7), (400, 40, 1, 6)]
+    result = batch_depreciation.declining_balance(*zip(*assets))
+    assert result['asset_value'].shape == (4, 8)
+    for row, args in enumerate(assets):
+        _assert_padded_schedule(result, depreciation.declining_balance(*args), row)
+
+
+def test_internal_rate_of_return():
+    cash_flows = [
+        [-120000, 39000, 30000, 21000, 37000],
+        [-70000, 12000, 15000, 18000, 21000],
+        [-100, 10, 0, 0, 0],
+        [10, 10, 0, 0, 0],
+        [-100, 230, -132, 0, 0],
+    ]
+    result = batch_time_value.internal_rate_of_return(cash_flows, tolerance=1e-12)
+    assert list(result['converged']) == [True, True, True, False, True]
+    assert np.isnan(result['rate'][3])
+    for row in (0, 1, 2, 4):
+        assert round(result['rate'][row], 8) == round(time_value.internal_rate_of_return(cash_flows[row]), 8)
+    for guess in (0.4, 0.5):
+        result = batch_time_value.internal_rate_of_return([[-1, 3, -2]], guess)
+        assert result['rate'][0] == time_value.internal_rate_of_return([-1, 3, -2], guess)
+
+
+def test_xirr():
+    dates = np.array(['2008-01-01', '2008-03-01', '2008-10-30', '2009-02-15', '2009-04-01'], dtype='datetime64[D]')
+    cash_flows = [[-10000, 2750, 4250, 3250, 2750], [-10000, 2750, 4250, 3250, 0]]
+    result = batch_time_value.xirr(cash_flows, dates)
+    assert result['converged'].all()
+    assert round(result['rate'][0], 4) == 0.3734
+    day_numbers = (dates - dates[0]).astype(np.int64)
+    assert np.allclose(batch_time_value.xirr(cash_flows, np.stack([day_numbers, day_numbers]))['rate'], result['rate'])
+
+
+def test_discounted_cash_flow():
+    cash_flows = [1000, 1000, 4000, 4000, 6000]
+    rates = np.array([0, 0.05, 0.1])
+    curve = batch_time_value.discounted_cash_flow(cash_flows, rates)
+    assert curve.shape == (3,)
+    assert np.allclose(curve, [time_value.discounted_cash_flow(cash_flows, rate) for rate in rates])
+    assert batch_time_value.discounted_cash_flow([cash_flows, cash_flows[::-1]], rates).shape == (2, 3)
+    assert batch_time_value.discounted_cash_flow([], 0.05) == 0
+
+    # Cancelling cash flows lose most of their digits without compensation
+    cash_flows = [1e16, 1.0, -1e16, 1.0]
+    discount_factor = Fraction(1 / 1.5)
+    exact = sum(Fraction(cf) * discount_factor ** (i + 1) for i, cf in enumerate(cash_flows))
+    assert batch_time_value.discounted_cash_flow(cash_flows, 0.5, compensated=True) == float(exact)
+
+
+# Curves
+def test_discount_factors():
+    times = np.linspace(-1, 8, 91)
+    for interpolation in ('linear', 'log_linear', 'cubic'):
+        curve = curves.yield_curve([1, 2, 3, 5], [0.02, 0.025, 0.03, 0.032], interpolation)
+        assert np.allclose(batch_curves.discount_factors(curve, times), curve.discount_factors(times))
+    curve = curves.yield_curve(np.array([1, 2, 3, 5]), np.array([0.02, 0.025, 0.03, 0.032]))
+    assert curve.tenors == (1.0, 2.0, 3.0, 5.0)
+    assert batch_curves.curve_arrays(curve) is batch_curves.curve_arrays(curve)
+    assert not batch_curves.curve_arrays(curve)[0].flags.writeable
+    curve = curves.yield_curve([1, 3], [0.02, 0.04])
+    cash_flows = [[100, 100, 100], [1000, 1000, 4000]]
+    expected = [time_value.discounted_cash_flow(row, curve) for row in cash_flows]
+    assert np.allclose(batch_time_value.discounted_cash_flow(cash_flows, curve), expected)
+
+
+# Securities
+def test_norberts_gambit():
+    scenarios = [(10, 50, 45, 1, 0, 0), (10, 10, 9, 1.1, 0, 0), (20, 15, 10, 1.5, 7.5, 5)]
+    result = batch_securities.norberts_gambit(*zip(*scenarios))
+    for row, args in enumerate(scenarios):
+        expected = securities.norberts_gambit(*args)
+        for field in batch_securities.GAMBIT_DTYPE.names:
+            assert np.isclose(result[field][row], expected[field])
+
+    purchase_price, sale_price, rate = np.ix_([10, 20], [9, 10, 11], [1.0, 1.1, 1.2, 1.3])
+    grid = batch_securities.norberts_gambit(100, purchase_price, sale_price, rate, 9.99, 9.99)
+    assert grid.shape == (2, 3, 4)
+    expected = securities.norberts_gambit(100, 20, 11, 1.3, 9.99, 9.99)
+    assert np.isclose(grid['converted_gain'][1, 2, 3], expected['converted_gain'])
+
+
+def test_break_even_rate():
+    purchase_price, sale_price = np.ix_([10, 20], [9, 10, 11])
+    rate = batch_securities.break_even_rate(100, purchase_price, sale_price, 5, 5)
+    assert rate.shape == (2, 3)
+    assert np.isnan(batch_securities.break_even_rate(0, 10, 9))
+    gains = batch_securities.norberts_gambit(100, purchase_price, sale_price, rate, 5, 5)
+    assert np.allclose(gains['base_gain'], 0)
+    assert np.allclose(gains['converted_gain'], 0)
+
+
+def test_alpha():
+    assert np.allclose(batch_securities.alpha([0, 40, 4], [0, 7.5, 6.5]), [0, 32.5, -2.5])
+
+
+def test_expected_rate_of_return():
+    result = batch_securities.expected_rate_of_return([0, 0.02, 0.10], [0, 1.5, 1.1], [0, 0.02, 0.20])
+    assert np.allclose(result, [0, 0.05, 0.32])
+
+
+def test_rolling_beta():
+    rng = np.random.default_rng(0)
+    benchmark = rng.normal(0.0005, 0.01, 250)
+    returns = np.stack([1.5 * benchmark, rng.normal(0.001, 0.02, 250), -0.5 * benchmark + 0.001], axis=1)
+    beta = batch_securities.rolling_beta(returns, benchmark, 60)
+    assert beta.shape == (250, 3)
+    assert np.isnan(beta[:59]).all()
+    assert np.allclose(beta[59:, 0], 1.5)
+    assert np.allclose(beta[59:, 2], -0.5)
+    for period in (59, 100, 249):
+        window = slice(period - 59, period + 1)
+        covariance = np.cov(returns[window, 1], benchmark[window])
+        assert np.isclose(beta[period, 1], covariance[0, 1] / covariance[1, 1])
+    assert np.allclose(batch_securities.rolling_beta(returns[:, 1], benchmark, 60), beta[:, 1], equal_nan=True)
+
+
+def test_capm_analytics():
+    benchmark = np.array([0.01, -0.02, 0.015, 0.03, -0.01])
+    returns = np.stack([2 * benchmark, benchmark + 0.01], axis=1)
+    result = batch_securities.capm_analytics(returns, benchmark, 0.001, 3)
+    assert np.allclose(result['beta'][2:], [[2, 1]] * 3)
+    expected = securities.expected_rate_of_return(0.001, 2, benchmark[4] - 0.001)
+    assert np.isclose(result['expected_rate_of_return'][4, 0], expected)
+    assert np.isclose(result['alpha'][4, 0], securities.alpha(returns[4, 0], expected))
+    assert np.allclose(result['alpha'][2:, 1], 0.01)
+
+
+def test_binomial_option_price():
+    strike_price = np.array([90, 100, 110])
+    expiry = np.array([[0.5], [1.0]])
+    for call in (True, False):
+        for american in (False, True):
+            result = batch_securities.binomial_option_price(100, strike_price, 0.05, 0.25, expiry, 101, call, american, 0.02)
+            assert result.shape == (2, 3)
+            for row, column in np.ndindex(result.shape):
+                expected = securities.binomial_option_price(
+                    100, strike_price[column], 0.05, 0.25, expiry[row, 0], 101, call, american, 0.02
+                )
+                assert np.isclose(result[row, column], expected)
+    mixed = batch_securities.binomial_option_price(50, 50, 0.1, 0.4, 5 / 12, 5, [True, False], True)
+    assert round(mixed[1], 2) == 4.49
+
+    # Up probabilities of exactly 0 and 1 reach a single terminal node
+    for dividend_yield, rate in ((0.25, 0.0), (0.0, 0.25)):
+        result = batch_securities.binomial_option_price(100, strike_price, rate, 0.25, 1, 1, True, False, dividend_yield)
+        expected = [
+            securities.binomial_option_price(100, strike, rate, 0.25, 1, 1, True, False, dividend_yield)
+            for strike in strike_price
+        ]
+        assert np.allclose(result, expected)
+
+
+def test_bond_portfolio():
+    # Ten year 8% semi-annual bond at a 6% yield with a third of the coupon period accrued
+    bonds = batch_bonds.bond_portfolio([1000, 100, 100], [0.08, 0.05, 0], [20, 1, 10], 2, [1 / 3, 0, 0])
+    analytics = bonds.analytics([0.06, 0.05, 0.04])
+    times = np.arange(1, 21) - 1 / 3
+    cash_flows = np.full(20, 40.0)
+    cash_flows[-1] += 1000
+    present_values = cash_flows / 1.03 ** times
+    dirty = present_values.sum()
+    assert np.isclose(analytics['dirty_price'][0], dirty)
+    assert np.isclose(analytics['accrued_interest'][0], 40 / 3)
+    assert np.isclose(analytics['clean_price'][0], dirty - 40 / 3)
+    assert np.isclose(analytics['macaulay_duration'][0], (times * present_values).sum() / dirty / 2)
+    assert np.isclose(analytics['modified_duration'][0], analytics['macaulay_duration'][0] / 1.03)
+    assert np.isclose(analytics['convexity'][0], (times * (times + 1) * present_values).sum() / dirty / (2 * 1.03) ** 2)
+
+    # A bond with one coupon period left is worth its final payment discounted over that period, and a zero coupon
+    # bond has a duration of its term
+    assert np.isclose(analytics['dirty_price'][1], 102.5 / 1.025)
+    assert np.isclose(analytics['macaulay_duration'][2], 5)
+    assert np.allclose(bonds.dirty_price([0.06, 0.05, 0.04]), analytics['dirty_price'])
+    assert np.allclose(bonds.convexity([0.06, 0.05, 0.04]), analytics['convexity'])
+
+    result = bonds.yield_to_maturity(analytics['clean_price'])
+    assert result['converged'].all()
+    assert np.allclose(result['rate'], [0.06, 0.05, 0.04])
+    assert np.allclose(bonds.yield_to_maturity(analytics['dirty_price'], dirty=True, guess=0.5)['rate'], [0.06, 0.05, 0.04])
+    with pytest.raises(ValueError):
+        batch_bonds.bond_portfolio(100, 0.05, 0)
+
+
+# Fixed Point
+def test_to_fixed():
+    assert batch_fixed_point.to_fixed([1.005, 1.015, -1.005, 0.125]).tolist() == [100, 102, -100, 12]
+    assert batch_fixed_point.to_fixed([1.005, -1.005], rounding='half_up').tolist() == [101, -101]
+    assert batch_fixed_point.to_fixed([1.009, -1.009], rounding='down').tolist() == [100, -100]
+    assert batch_fixed_point.to_fixed(1.0005, 1000, 'half_up') == 1001
+    assert batch_fixed_point.to_float(batch_fixed_point.to_fixed(12.34)) == 12.34
+    with pytest.raises(ValueError):
+        batch_fixed_point.to_fixed(1, rounding='ceiling')
+
+
+def test_fixed_point_loan_payment_schedule():
+    principal = np.array([1000, 100000, 150000.55, 500])
+    interest_rate = np.array([0, 0.10, 0.0725, 0.06])
+    term = np.array([12, 360, 180, 6])
+    result = batch_fixed_point.loan_payment_schedule(principal, interest_rate, 12, term)
+    assert result['payment'].dtype == np.int64
+    assert (result['remaining_balance'][np.arange(4), term - 1] == 0).all()
+    assert (result['principal_payment'].sum(axis=1) == batch_fixed_point.to_fixed(principal)).all()
+    assert (result['payment'] == result['principal_payment'] + result['interest_payment']).all()
+
+    # Matches the same schedule computed in Decimal with banker's rounding to the cent
+    for row in range(4):
+        cent = Decimal('0.01')
+        payment = Decimal(str(general.loan_payment(principal[row], interest_rate[row], 12, term[row])))
+        payment = payment.quantize(cent, ROUND_HALF_EVEN)
+        balance = Decimal(str(principal[row]))
+        for period in range(term[row]):
+            interest = (balance * Decimal(str(interest_rate[row])) / 12).quantize(cent, ROUND_HALF_EVEN)
+            paid = balance if period == term[row] - 1 else payment - interest
+            balance -= paid
+            assert result['interest_payment'][row, period] == int(interest * 100)
+            assert result['remaining_balance'][row, period] == int(balance * 100)
+    assert (result['payment'][3, 6:] == 0).all()
+
+
+def test_fixed_point_depreciation():
+    result = batch_fixed_point.sum_of_years_depreciation([1000, 999.99, 100], [1, 0, 3.33], [7, 3, 1])
+    assert result['asset_value'][:, -1].tolist() == [100, 0, 333]
+    assert result['periodic_depreciation'][1, :4].tolist() == [0, 50000, 33333, 16666]
+    expected = depreciation.sum_of_years_depreciation(1000, 1, 7)['periodic_depreciation']
+    assert np.allclose(result['periodic_depreciation'][0] / 100, expected, atol=0.01)
+
+    result = batch_fixed_point.double_declining_balance_depreciation([1000, 1000], [100, 0], [5, 3], scale=1000)
+    assert result['asset_value'][0].tolist() == [1000000, 600000, 360000, 216000, 129600, 100000]
+    assert result['periodic_depreciation'][1].tolist() == [0, 666667, 222222, 74074, 0, 0]
+    result = batch_fixed_point.double_declining_balance_depreciation(4.6e16, 0, 5)
+    assert result['periodic_depreciation'][0, :3].tolist() == [0, 1840000000000000000, 1104000000000000000]
+    assert batch_fixed_point.double_declining_balance_depreciation(4.6e8, 0, 5, 2.00000001)['asset_value'][0, 1] == (
+        27599999908
+    )
+    with pytest.raises(OverflowError):
+        batch_fixed_point.double_declining_balance_depreciation(4.7e16, 0, 5)
+    with pytest.raises(OverflowError):
+        batch_fixed_point.double_declining_balance_depreciation(4.7e8, 0, 5, 2.00000001)
+    with pytest.raises(OverflowError):
+        batch_fixed_point.loan_payment_schedule(1e15, 0.1, 12, 12)
+
+
+# Risk
+def test_key_rate_durations():
+    tenors, zero_rates = [1, 2, 5, 10, 30], [0.02, 0.025, 0.03, 0.035, 0.04]
+    curve = curves.yield_curve(tenors, zero_rates)
+    cash_flows = np.random.default_rng(0).uniform(0, 100, (3, 40))
+    result = batch_risk.key_rate_durations(cash_flows, curve)
+    assert np.allclose(result['value'], [time_value.discounted_cash_flow(row, curve) for row in cash_flows])
+
+    # Bumping a key rate matches a full revaluation on a curve with that tenor's zero rate bumped
+    for key in range(len(tenors)):
+        values = []
+        for bump in (-0.0001, 0.0001):
+            bumped = curves.yield_curve(tenors, [rate + bump * (i == key) for i, rate in enumerate(zero_rates)])
+            values.append([time_value.discounted_cash_flow(row, bumped) for row in cash_flows])
+        dv01 = (np.array(values[0]) - np.array(values[1])) / 2
+        assert np.allclose(result['key_rate_dv01'][:, key], dv01, rtol=1e-8)
+        assert np.allclose(result['key_rate_duration'][:, key], dv01 / 0.0001 / result['value'], rtol=1e-8)
+
+    parallel = [
+        time_value.discounted_cash_flow(row, curves.yield_curve(tenors, [rate - 0.0001 for rate in zero_rates]))
+        - time_value.discounted_cash_flow(row, curves.yield_curve(tenors, [rate + 0.0001 for rate in zero_rates]))
+        for row in cash_flows
+    ]
+    assert np.allclose(result['dv01'], np.array(parallel) / 2, rtol=1e-6)
+
+    # Cash flows outside every triangle but the last only move with the last key rate
+    result = batch_risk.key_rate_durations([[0, 100]], curve, [0.5, 1, 2], [0, 3], bump=0.001)
+    assert np.allclose(result['key_rate_dv01'][0, :2], 0)
+    assert result['key_rate_dv01'][0, 2] > 0
+    with pytest.raises(ValueError):
+        batch_risk.key_rate_durations([[100, 100]], curve, [2, 1])
+
+
+# Simulation
+def test_simulate_future_value():
+    # Without volatility every path follows the deterministic reversion towards the long term rate
+    model = batch_simulation.vasicek_model(0.01, 0.5, 0.03, 0)
+    result = batch_simulation.simulate_future_value(1000, model, 10, 500, seed=1, chunk_size=128)
+    schedule = model(np.random.default_rng(), 1, 10)[0]
+    expected = time_value.future_value_schedule(1000, schedule.tolist())
+    assert np.isclose(result['mean'], expected)
+    assert np.isclose(result['percentiles'][50], expected)
+    assert result['std'] < 1e-9
+    assert np.isclose(result['mean_path'][-1], expected)
+    assert np.isclose(result['mean_path'][0], 1010)
+
+    constant = batch_simulation.bootstrap_model([0.05], 1)
+    result = batch_simulation.simulate_future_value(100, constant, 3, 10, seed=1)
+    assert np.isclose(result['min'], 115.7625) and np.isclose(result['max'], 115.7625)
+
+    model = batch_simulation.cir_model(0.02, 0.2, 0.03, 0.05)
+    assert model(np.random.default_rng(3), 1000, 24).min() >= 0
+    serial = batch_simulation.simulate_future_value(1000, model, 24, 2000, seed=7, chunk_size=500)
+    parallel = batch_simulation.simulate_future_value(1000, model, 24, 2000, seed=7, chunk_size=500, workers=2)
+    assert serial['percentiles'] == parallel['percentiles']
+    assert serial['min'] <= serial['percentiles'][5] <= serial['mean'] <= serial['percentiles'][95] <= serial['max']
+    with pytest.raises(ValueError):
+        batch_simulation.simulate_future_value(1000, model, 24, 0)
@@ -1,4 +1,20 @@
-from pfinance import conversion, depreciation, general, securities, time_value
+import datetime
+import functools
+import importlib.metadata
+import math
+import operator
+import os
+import subprocess
+import sys
+import threading
+from array import array
+
+import pytest
+
+import pfinance
+from pfinance import (
+    _sequences, combinatorics, conversion, curves, depreciation, factors, general, parallel, securities, time_value,
+)
 
 
 # Helper functions
@@ -84,6 +100,25 @@ def test_loan_payment_schedule():
     assert _compare_list_float(general.loan_payment_schedule(500, 0, 12, 5)['remaining_balance'], remaining_balance3, 2)
 
 
+def test_amortization_schedule():
+    for args in [(1000, 0.12, 12, 6), (526, 0.06, 12, 7), (500, 0, 12, 5), (150000, 0.10, 12, 60, 50000)]:
+        expected = general.loan_payment_schedule(*args)
+        schedule = general.amortization_schedule(*args)
+        assert len(schedule) == args[3]
+        for key in ('principal_payment', 'interest_payment', 'remaining_balance'):
+            assert _compare_list_float([row[key] for row in schedule], expected[key], 6)
+            assert _compare_list_float([row[key] for row in schedule[2:5]], expected[key][2:5], 6)
+    schedule = general.amortization_schedule(1000, 0.12, 12, 6)
+    assert round(schedule.get_payment(), 2) == 172.55
+    assert round(schedule.remaining_balance(0), 2) == 1000.00
+    assert round(schedule.remaining_balance(4), 2) == 339.99
+    assert round(schedule.interest_payment(2), 2) == 8.37
+    assert round(schedule.principal_payment(6), 2) == 170.84
+    assert round(schedule[-1]['remaining_balance'], 2) == 0.00
+    assert len(schedule[::2]) == 3
+    assert [row['interest_payment'] for row in schedule[1:][::2]] == [row['interest_payment'] for row in schedule[1::2]]
+
+
 def test_number_periods_loan():
     assert general.number_periods_loan(1000, 0.1, 100) == -1
     assert round(general.number_periods_loan(1000, 0.1, 200), 2) == 7.27
@@ -107,6 +142,7 @@ def test_sum_squares():
 def test_factorial():
     assert general.factorial(0) == 1
     assert general.factorial(1) == 1
+    assert general.factorial(-1) == 1
     assert general.factorial(10) == 3628800
     assert general.factorial(69) == \
         171122452428141311372468338881272839092270544893520369393648040923257279754140647424000000000000000
@@ -151,6 +187,42 @@ def test_future_value_schedule():
     assert round(time_value.future_value_schedule(15973, [0.02, 0.09, -0.08, 0.2]), 2) == 19605.69
 
 
+def test_internal_rate_of_return():
+    assert time_value.internal_rate_of_return([]) is None
+    assert time_value.internal_rate_of_return([10, 10]) is None
+    assert round(time_value.internal_rate_of_return([-120000, 39000, 30000, 21000, 37000]), 6) == 0.023664
+    assert round(time_value.internal_rate_of_return([-70000, 12000, 15000, 18000, 21000]), 4) == -0.0212
+    assert round(time_value.internal_rate_of_return([-100, 10]), 6) == -0.9
+    assert round(time_value.internal_rate_of_return([-100, 230, -132]), 6) == 0.1
+    assert round(time_value.internal_rate_of_return([-100, 230, -132], 0.15), 6) == 0.2
+    # Exact roots at 0% and 100% are equally close to a guess of 50%, the Newton step from the guess decides
+    assert time_value.internal_rate_of_return([-1, 3, -2], 0.4) == 0
+    assert time_value.internal_rate_of_return([-1, 3, -2], 0.5) == 1
+
+
+def test_xirr():
+    dates = [datetime.date(2008, 1, 1), datetime.date(2008, 3, 1), datetime.date(2008, 10, 30),
+             datetime.date(2009, 2, 15), datetime.date(2009, 4, 1)]
+    assert time_value.xirr([10, 10, 10, 10, 10], dates) is None
+    assert round(time_value.xirr([-10000, 2750, 4250, 3250, 2750], dates), 4) == 0.3734
+    assert round(time_value.xirr((-10000, 2750, 4250, 3250, 2750), iter(dates)), 4) == 0.3734
+    assert time_value.xirr([], []) is None
+    with pytest.raises(ValueError):
+        time_value.xirr([-10000, 2750, 4250], dates)
+
+
+def test_time_value_yield_curve():
+    flat = curves.yield_curve([1, 10], [0.05, 0.05])
+    cash_flows = [1000, 1000, 4000, 4000, 6000]
+    assert round(time_value.discounted_cash_flow(cash_flows, flat), 2) == 13306.73
+    assert round(time_value.present_value(500, flat, 48, 9000), 2) == round(time_value.present_value(500, 0.05, 48, 9000), 2)
+    assert round(time_value.present_value(200, flat, 36, 1000, True), 2) == \
+        round(time_value.present_value(200, 0.05, 36, 1000, True), 2)
+    curve = curves.yield_curve([1, 3], [0.02, 0.04])
+    expected = 100 / 1.02 + 100 / 1.03 ** 2 + 100 / 1.04 ** 3
+    assert round(time_value.discounted_cash_flow([100, 100, 100], curve), 4) == round(expected, 4)
+
+
 # Conversion
 def test_dollar_decimal():
     assert round(conversion.dollar_decimal(1.2, 16), 2) == 2.25
@@ -278,6 +350,30 @@ def test_declining_balance():
     assert _compare_list_float(depreciation.declining_balance(900, 29, 5, 7)['periodic_depreciation'], depreciation3, 2)
 
 
+def test_iter_depreciation():
+    rows = list(depreciation.iter_sum_of_years_depreciation(1000, 20, 5))
+    assert [row[0] for row in rows] == [0, 1, 2, 3, 4, 5]
+    assert _compare_list_float([row[1] for row in rows], [1000.0, 673.33, 412.00, 216.00, 85.33, 20.00], 2)
+    assert _compare_list_float([row[2] for row in rows], [0.0, 326.67, 261.33, 196.00, 130.67, 65.33], 2)
+    rows = list(depreciation.iter_double_declining_balance_depreciation(20000, 1000, 6, 3))
+    assert _compare_list_float([row[1] for row in rows], [20000.0, 10000.0, 5000.0, 2500.0, 1250.00, 1000.0, 1000.0], 2)
+    rows = list(depreciation.iter_declining_balance(500, 20, 6, 3))
+    assert [row[0] for row in rows] == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert _compare_list_float([row[2] for row in rows], [0.0, 51.88, 185.97, 108.79, 63.64, 37.23, 21.78, 9.56], 2)
+
+
+def test_stream_depreciation_schedules():
+    chunks = []
+    assets = [(1000, 20, 5), (12345, 321, 7), (100, 0, 1)]
+    rows = depreciation.stream_depreciation_schedules(depreciation.iter_sum_of_years_depreciation, assets, chunks.append, 4)
+    assert rows == 6 + 8 + 2
+    assert [len(chunk['period']) for chunk in chunks] == [4, 4, 4, 4]
+    asset = [i for chunk in chunks for i in chunk['asset']]
+    asset_value = [value for chunk in chunks for value in chunk['asset_value']]
+    assert asset == [0] * 6 + [1] * 8 + [2] * 2
+    assert _compare_list_float(asset_value[6:14], depreciation.sum_of_years_depreciation(12345, 321, 7)['asset_value'], 6)
+
+
 # Securities
 def test_bond_coupon_rate():
     assert securities.bond_coupon_rate(1000, 0) == 0.00
@@ -311,6 +407,19 @@ def expected_rate_of_return():
     assert securities.expected_rate_of_return(0.10, 1.1, 0.20) == 0.32
 
 
+def test_binomial_option_price():
+    # Hull, Options, Futures, and Other Derivatives: five step American put
+    assert round(securities.binomial_option_price(50, 50, 0.1, 0.4, 5 / 12, 5, call=False, american=True), 2) == 4.49
+    # Converges to the Black-Scholes prices of 10.4506 and 10.6753
+    assert round(securities.binomial_option_price(100, 100, 0.05, 0.2, 1, 2000), 2) == 10.45
+    assert round(securities.binomial_option_price(100, 110, 0.05, 0.2, 1, 2000, call=False), 2) == 10.68
+    # Early exercise of a call without dividends is never optimal
+    european = securities.binomial_option_price(100, 110, 0.05, 0.2, 1, 200)
+    assert round(securities.binomial_option_price(100, 110, 0.05, 0.2, 1, 200, american=True), 8) == round(european, 8)
+    assert securities.binomial_option_price(100, 110, 0.05, 0.2, 1, 200, call=False, american=True) > \
+        securities.binomial_option_price(100, 110, 0.05, 0.2, 1, 200, call=False)
+
+
 def test_adjusted_cost_base():
     test_acb = securities.adjusted_cost_base()
     test_acb.buy(10, 10.00, 5.00)
@@ -321,3 +430,232 @@ def test_adjusted_cost_base():
     assert round(test_acb.get_acb(), 2) == 15.75
     assert round(test_acb.sell(10, 10.00, 5.00), 2) == -62.50
     assert round(test_acb.get_acb(), 2) == 0.00
+
+
+def test_acb_ledger():
+    trades = [
+        ('XEQT', 'buy', 10, 10.00, 5.00),
+        ('VFV', 'buy', 4, 100.00, 0.00),
+        ('XEQT', 'sell', 5, 15.00, 5.00),
+        ('XEQT', 'buy', 5, 20.00, 5.00),
+        ('VFV', 'sell', 4, 90.00, 1.00),
+        ('XEQT', 'sell', 10, 10.00, 5.00),
+    ]
+    ledger = securities.acb_ledger()
+    capital_gains = ledger.ingest(*zip(*trades[:4]))
+    assert _compare_list_float(capital_gains, [0.0, 0.0, 17.5, 0.0], 2)
+    assert round(ledger.get_acb('XEQT'), 2) == 15.75
+    assert ledger.get_shares('VFV') == 4
+    snapshot = ledger.snapshot()
+    assert snapshot['trade_count'] == 4
+    capital_gains = ledger.ingest(*zip(*trades[4:]))
+    assert _compare_list_float(capital_gains, [-41.0, -62.5], 2)
+    assert ledger.get_acb('XEQT') == 0
+    assert ledger.get_trade_count() == 6
+    resumed = securities.acb_ledger.from_snapshot(snapshot)
+    assert round(resumed.get_acb('XEQT'), 2) == 15.75
+    assert _compare_list_float(resumed.ingest(*zip(*trades[4:])), [-41.0, -62.5], 2)
+    assert resumed.snapshot() == ledger.snapshot()
+    assert ledger.get_acb('ZAG') == 0
+    with pytest.raises(ValueError):
+        ledger.ingest(['XEQT'], ['short'], [1], [1.0])
+
+
+def test_acb_portfolio():
+    portfolio = securities.acb_portfolio(stripes=4)
+    portfolio.buy('TFSA', 'XEQT', 10, 10.00, 5.00)
+    portfolio.buy('RRSP', 'XEQT', 10, 20.00)
+    assert round(portfolio.sell('TFSA', 'XEQT', 5, 15.00, 5.00), 2) == 17.5
+    assert round(portfolio.get_acb('TFSA', 'XEQT'), 2) == 10.50
+    assert portfolio.get_acb('RRSP', 'XEQT') == 20.00
+    assert portfolio.get_acb('RRSP', 'VFV') == 0
+    assert portfolio.snapshot() == {('TFSA', 'XEQT'): (5, 52.5, 10.5), ('RRSP', 'XEQT'): (10, 200.0, 20.0)}
+
+    def trade(account):
+        for _ in range(1000):
+            portfolio.buy(account, 'VFV', 2, 100.00)
+            portfolio.sell(account, 'VFV', 1, 100.00)
+
+    threads = [threading.Thread(target=trade, args=(account,)) for account in ('TFSA', 'RRSP', 'TFSA', 'RRSP')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert portfolio.snapshot()[('TFSA', 'VFV')] == (2000, 200000.0, 100.0)
+
+
+# Factors
+def test_factor_cache():
+    cache = factors.factor_cache(max_size=10)
+    assert _compare_list_float(cache.compound_factors(0.05, 3), [1.0, 1.05, 1.1025, 1.157625], 6)
+    assert len(cache.compound_factors(0.05, 2)) == 3
+    assert cache.get_stats() == {'hits': 1, 'misses': 1, 'size': 4, 'max_size': 10}
+    assert cache.compound_factors(0.05, 5)[5] == 1.05 ** 5  # Extends the vector of the rate instead of adding one
+    assert cache.get_stats()['size'] == 8
+    assert _compare_list_float(cache.discount_factors(0.25, 2), [1.0, 0.8, 0.64], 6)
+    assert cache.get_stats() == {'hits': 1, 'misses': 3, 'size': 3, 'max_size': 10}  # Least recently used evicted
+    assert len(cache.discount_factors(0.1, 20)) == 21  # Longer than the bound, so returned without caching
+    assert cache.get_stats()['size'] == 3
+    cache.clear()
+    assert cache.get_stats() == {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 10}
+
+
+def test_factor_cache_functions():
+    cache = factors.factor_cache()
+    cash_flows = [1000, 1000, 4000, 4000, 6000]
+    for _ in range(2):
+        assert round(time_value.discounted_cash_flow(cash_flows, 0.05, cache), 2) == 13306.73
+    assert round(time_value.discounted_cash_flow(cash_flows[:3], 0.05, cache), 2) == 5314.76
+    assert cache.get_stats()['hits'] == 2
+
+
+# Curves
+def test_yield_curve():
+    curve = curves.yield_curve([1, 2, 3, 5], [0.02, 0.025, 0.03, 0.032])
+    assert curve.discount_factor(0) == 1.0
+    assert curve.zero_rate(0.5) == 0.02
+    assert curve.zero_rate(10) == 0.032
+    assert round(curve.zero_rate(2.5), 6) == 0.0275
+    assert round(curve.discount_factor(2.5), 6) == round(1.0275 ** -2.5, 6)
+    assert _compare_list_float(curve.discount_factors([1, 2, 3]), [1.02 ** -1, 1.025 ** -2, 1.03 ** -3], 10)
+    log_linear = curves.yield_curve.from_discount_factors([1, 2], [0.98, 0.95])
+    assert round(log_linear.discount_factor(1.5), 6) == round((0.98 * 0.95) ** 0.5, 6)
+    assert round(log_linear.discount_factor(2), 6) == 0.95
+    cubic = curves.yield_curve([1, 2, 3, 5], [0.02, 0.025, 0.03, 0.032], 'cubic')
+    assert round(cubic.zero_rate(2), 6) == 0.025
+    assert round(cubic.zero_rate(1.5), 5) == 0.02243
+    assert round(cubic.zero_rate(4), 5) == 0.03204
+    assert curve.tenors == (1.0, 2.0, 3.0, 5.0) and curve.interpolation == 'linear' and curve.curvature is None
+    assert round(log_linear.log_discount_factors[1], 10) == round(math.log(0.95), 10)
+    assert cubic.curvature[0] == 0 and len(cubic.curvature) == 4
+    with pytest.raises(AttributeError):
+        curve.tenors = (1, 2)
+    with pytest.raises(ValueError):
+        curves.yield_curve([1, 2], [0.02, 0.03], 'quadratic')
+    with pytest.raises(ValueError):
+        curves.yield_curve([2, 1], [0.02, 0.03])
+    with pytest.raises(ValueError):
+        curves.yield_curve([], [])
+
+
+# Sequences
+def test_buffer_inputs():
+    cash_flows = array('d', [-120000, 39000, 30000, 21000, 37000])
+    view = memoryview(cash_flows)
+    assert time_value.discounted_cash_flow(view, 0.05) == time_value.discounted_cash_flow(list(cash_flows), 0.05)
+    assert round(time_value.modified_internal_rate_of_return(view, 0.1, 0.12), 3) == 0.063
+    assert round(time_value.internal_rate_of_return(cash_flows), 6) == 0.023664
+    assert round(time_value.future_value_schedule(1000, array('d', [0.02, 0.03, 0.04, 0.05])), 2) == 1147.26
+    assert general.sum_product(array('l', [3, 5, 6, 1]), memoryview(array('d', [4, 2, 7, 8]))) == 72
+    assert general.sum_squares(array('i', [5, 2, 1, 3])) == 39
+    assert general.sum_diff_squares(array('d', [5, 2, 3]), (3, -1, 4)) == 12
+    assert general.sum_squares(val for val in [5, 2, 1, 3]) == 39
+
+    np = pytest.importorskip('numpy')
+    matrix = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert isinstance(_sequences.as_sequence(matrix), memoryview)
+    assert list(_sequences.as_sequence(matrix)) == [1.0, 2.0, 3.0, 4.0]
+    assert _sequences.as_sequence(np.array([1.5, 2.5], dtype='>f8')) == [1.5, 2.5]
+    assert list(_sequences.as_sequence(matrix.T)) == [1.0, 3.0, 2.0, 4.0]
+    assert general.sum_squares(matrix.T) == 30
+    assert _sequences.as_sequence(np.array(['2020-01-01'], dtype='datetime64[D]')) == [datetime.date(2020, 1, 1)]
+    for scalar in (np.float64(1.0), np.array(1.0), np.array('2020-01-01', dtype='datetime64[D]')):
+        with pytest.raises(TypeError, match='values must be a sequence'):
+            _sequences.as_sequence(scalar)
+    curve = curves.yield_curve(np.array([1, 3]), array('d', [0.02, 0.04]))
+    assert curve.discount_factors(np.array([1.0, 3.0])) == [1.02 ** -1, 1.04 ** -3]
+    assert general.sum_product(np.arange(1, 6), np.arange(1, 6)) == 55
+    assert type(time_value.future_value_schedule(1000, np.array([0.02, 0.03]))) is float
+    ledger = securities.acb_ledger()
+    ledger.ingest(np.array([1, 1]), np.array(['buy', 'sell']), np.array([10, 5]), np.array([10.0, 15.0]))
+    assert ledger.get_shares(1) == 5
+
+
+# Combinatorics
+def test_combinatorics_factorial():
+    assert combinatorics.factorial(0) == 1
+    assert combinatorics.factorial(20) == 2432902008176640000
+    assert combinatorics.factorial(69) == general.factorial(69)
+    large = combinatorics.MAX_CACHED_FACTORIAL + 10
+    assert combinatorics.factorial(large) == math.factorial(large)
+    with pytest.raises(ValueError):
+        combinatorics.factorial(-1)
+    assert round(combinatorics.log_factorial(10), 10) == round(math.log(3628800), 10)
+    assert round(combinatorics.log_gamma(0.5), 10) == round(math.log(math.sqrt(math.pi)), 10)
+
+
+def test_binomial():
+    assert combinatorics.binomial(5, 2) == 10
+    assert combinatorics.binomial(5, 6) == 0
+    assert combinatorics.binomial(5, -1) == 0
+    assert combinatorics.binomial(100, 50) == 100891344545564193334812497256
+    assert round(combinatorics.log_binomial(100, 50), 8) == round(math.log(100891344545564193334812497256), 8)
+
+
+def test_binomial_probabilities():
+    assert _compare_list_float(combinatorics.binomial_probabilities(4, 0.5), [0.0625, 0.25, 0.375, 0.25, 0.0625], 12)
+    assert combinatorics.binomial_probabilities(3, 0) == [1.0, 0.0, 0.0, 0.0]
+    assert combinatorics.binomial_probabilities(3, 1) == [0.0, 0.0, 0.0, 1.0]
+    row = combinatorics.binomial_probabilities(10000, 0.5)
+    assert round(sum(row), 10) == 1
+    assert round(row[5000], 8) == round(math.comb(10000, 5000) / 2 ** 10000, 8)
+    for p in (-0.1, 1.1, float('nan')):
+        with pytest.raises(ValueError):
+            combinatorics.binomial_probabilities(3, p)
+
+
+# Parallel
+def test_parallel_map():
+    principal = [1000, 100000, 150000, 500, 2500]
+    interest_rate = [0, 0.10, 0.10, 0.06, 0.04]
+    schedules = parallel.parallel_map(general.loan_payment_schedule, principal, interest_rate, [12] * 5, [12] * 5,
+                                      workers=2, chunk_size=2)
+    for schedule, args in zip(schedules, zip(principal, interest_rate)):
+        expected = general.loan_payment_schedule(*args, 12, 12)
+        assert schedule == expected
+
+    payments = parallel.parallel_map(general.loan_payment, principal, interest_rate, [12] * 5, [12] * 5, workers=2)
+    assert payments == list(map(general.loan_payment, principal, interest_rate, [12] * 5, [12] * 5))
+
+    depreciation_schedule = functools.partial(depreciation.double_declining_balance_depreciation, useful_life=5)
+    results = parallel.parallel_map(depreciation_schedule, array('d', [1000, 2000]), (100, 0), workers=2)
+    assert results[1] == depreciation_schedule(2000, 0)
+
+    # Results that can not be stored as doubles are pickled, so types match a serial map for any number of workers
+    columns = ([10, 20], [1.5, 2], [1.25, 2.5], [1.3, 1.35])
+    assert parallel.parallel_map(securities.norberts_gambit, *columns, workers=2) == list(
+        map(securities.norberts_gambit, *columns)
+    )
+    rates = parallel.parallel_map(time_value.internal_rate_of_return, [[-100, 110], [10, 10]], workers=2)
+    assert round(rates[0], 8) == 0.1 and rates[1] is None
+    lengths = parallel.parallel_map(len, [[1.0], [1.0, 2.0]], workers=2)
+    assert lengths == [1, 2] and all(type(length) is int for length in lengths)
+    with pytest.raises(ZeroDivisionError):
+        parallel.parallel_map(operator.truediv, [1.0, 2.0, 3.0, 4.0], [1.0, 0.0, 1.0, 1.0], workers=2, chunk_size=1)
+
+    assert parallel.parallel_map(general.sum_squares, [[1, 2], [3]], workers=1) == [5, 9]
+    with pytest.raises(ValueError):
+        parallel.parallel_map(general.loan_payment, [1000], [0.1, 0.2], [12], [12])
+
+
+# Package
+def test_lazy_import():
+    # Importing the package alone must not load any submodule, NumPy or the installed distribution metadata
+    code = (
+        'import sys; before = set(sys.modules); import pfinance; '
+        'print(sorted(set(sys.modules) - before)); pfinance.batch; print("numpy" in sys.modules)'
+    )
+    root = os.path.dirname(os.path.dirname(pfinance.__file__))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root).stdout
+    output = output.split('\n')
+    assert output[:2] == ["['pfinance']", 'False']
+    assert pfinance.general is general
+    assert 'time_value' in dir(pfinance)
+    with pytest.raises(AttributeError):
+        pfinance.missing
+
+
+def test_version(monkeypatch):
+    monkeypatch.delattr(pfinance, '__version__', raising=False)
+    monkeypatch.setattr(importlib.metadata, 'version', lambda name: '1.2.3')
+    assert pfinance.__version__ == '1.2.3'